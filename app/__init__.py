@@ -1,11 +1,33 @@
-import threading
-from flask import Flask
-from flask_socketio import SocketIO
+import importlib
+import logging
+import time
+from flask import Flask, request
+from flask_socketio import SocketIO, emit
 
 # Global verfügbar machen
-# logger=True zeigt uns im Docker-Log genau, was passiert
-socketio = SocketIO(cors_allowed_origins="*", async_mode="threading", logger=True, engineio_logger=True)
+# async_mode und Paket-Logging werden erst in create_app() aus der Config gesetzt
+socketio = SocketIO(cors_allowed_origins="*")
 game_instance = None
+log = logging.getLogger(__name__)
+
+
+def resolve_async_mode(mode):
+    """Prüft den gewünschten Server-Modus beim Start, statt erst bei der ersten Verbindung zu scheitern."""
+    from app.config import ASYNC_MODES
+
+    if mode not in ASYNC_MODES:
+        raise ValueError(f"Unbekannter SIMON_ASYNC_MODE '{mode}' (erlaubt: {', '.join(ASYNC_MODES)})")
+    if mode != "threading":
+        try:
+            importlib.import_module(mode)
+        except ImportError as exc:
+            raise RuntimeError(f"SIMON_ASYNC_MODE={mode}, aber das Paket ist nicht installiert: {exc}")
+    if mode == "gevent":
+        try:
+            importlib.import_module("geventwebsocket")
+        except ImportError:
+            log.warning("gevent ohne gevent-websocket -> nur Long-Polling möglich.")
+    return mode
 
 
 def create_app():
@@ -14,81 +36,159 @@ def create_app():
     app.config.from_object("app.config")
     app.config["SECRET_KEY"] = "simon_secret_key"
 
+    from app.logging_setup import configure_logging
+
+    configure_logging(app.config)
+
     # Extensions initialisieren
     import app.db as my_db
 
     my_db.init_app(app)
-    socketio.init_app(app)
+    socketio.init_app(
+        app,
+        async_mode=resolve_async_mode(app.config["ASYNC_MODE"]),
+        # LOG_SOCKETIO=1 zeigt im Docker-Log jedes Paket (nur zur Fehlersuche)
+        logger=app.config["LOG_SOCKETIO"],
+        engineio_logger=app.config["LOG_SOCKETIO"],
+    )
 
     # Blueprints registrieren
     from app.routes.main import main_bp
     from app.routes.remote import remote_bp
     from app.routes.admin import admin_bp
+    from app.routes.api import api_bp
+    from app.routes.metrics import metrics_bp
 
     app.register_blueprint(main_bp)
     app.register_blueprint(remote_bp)
     app.register_blueprint(admin_bp)
+    app.register_blueprint(api_bp)
+    app.register_blueprint(metrics_bp)
+
+    from app.repository import leaderboard, warm_leaderboard
+    from app.highscore_writer import HighscoreWriter
 
     with app.app_context():
         my_db.init_db()
+        warm_leaderboard()
+        # Highscores werden im Hintergrund gebündelt geschrieben
+        app.highscore_writer = HighscoreWriter(my_db.get_pool())
         app.game_instance = None  # Platzhalter
 
-    from app.gpio_logic import SimonSaysGame
+    from app.stations import StationRegistry
+    from app.recorder import SessionLog
+    from app.metrics import SOCKET_CLIENTS
+    from app.admin_stream import AdminDebugStream
+
+    def station_for_request():
+        return app.stations.station_for(request.sid, "/")
+
+    def game_for_request():
+        station = station_for_request()
+        return station.game if station is not None else None
 
     # --- ZENTRALE SOCKET HANDLER (Damit sie garantiert registriert werden) ---
     @socketio.on("connect")
     def handle_connect():
-        print("Client verbunden!")
-        if game_instance:
-            socketio.emit("led_snapshot", game_instance.get_led_snapshot())
-            socketio.emit("difficulty_changed", {"level": game_instance.current_difficulty})
+        log.info("Client verbunden: %s", request.sid, extra={"event": "client_connect"})
+        # ?station=<id> beim Handshake, ohne Angabe die erste Station
+        station_id = request.args.get("station")
+        station = app.stations.join(request.sid, "/", station_id)
+        if station is None and station_id is not None:
+            raise ConnectionRefusedError("unknown station")
+        SOCKET_CLIENTS.inc(("/",))
+        # Nur an den neuen Client, nicht an alle
+        if station is not None:
+            emit("led_snapshot", station.game.get_led_snapshot())
+            emit("difficulty_changed", {"level": station.game.current_difficulty})
+
+    @socketio.on("disconnect")
+    def handle_disconnect():
+        app.stations.leave(request.sid, "/")
+        SOCKET_CLIENTS.dec(("/",))
+
+    @socketio.on("join_station")
+    def handle_join_station(data=None):
+        station_id = data.get("station") if isinstance(data, dict) else None
+        station = app.stations.join(request.sid, "/", station_id)
+        if station is None:
+            emit("station_error", {"station": station_id, "error": "unknown station"})
+            return
+        emit("station_joined", {"station": station.id})
+        emit("state_sync", station.state_stream.snapshot())
 
     @socketio.on("remote_input")
     def handle_input(data):
+        received_at = time.monotonic()
         color = data.get("color")
-        if game_instance:
-            game_instance.process_remote_input(color)
+        game = game_for_request()
+        if game:
+            game.process_remote_input(color, sid=request.sid, received_at=received_at)
 
     @socketio.on("start_game")
     def handle_start():
-        if game_instance:
-            game_instance.process_remote_input("START_SIGNAL")
+        game = game_for_request()
+        if game:
+            game.process_remote_input("START_SIGNAL", sid=request.sid)
 
     @socketio.on("submit_highscore")
     def handle_highscore(data):
         name = data.get("name")
-        if game_instance:
-            game_instance.on_name_submitted(name)
+        game = game_for_request()
+        if game:
+            game.on_name_submitted(name)
 
     @socketio.on("change_difficulty")
     def handle_diff(data):
         level = data.get("level")
-        if game_instance:
-            game_instance.set_difficulty(level)
+        game = game_for_request()
+        if game:
+            game.set_difficulty(level)
 
     @socketio.on("request_snapshot")
     def handle_snap():
-        if game_instance:
-            socketio.emit("led_snapshot", game_instance.get_led_snapshot())
-            socketio.emit("difficulty_changed", {"level": game_instance.current_difficulty})
-
-    def game_socket_callback(event, data):
+        game = game_for_request()
+        if game:
+            emit("led_snapshot", game.get_led_snapshot())
+            emit("difficulty_changed", {"level": game.current_difficulty})
+
+    @socketio.on("resync")
+    def handle_resync(data=None):
+        seq = data.get("seq") if isinstance(data, dict) else None
+        station = station_for_request()
+        if station:
+            emit("state_sync", station.state_stream.since(seq))
+
+    # Jede Station hat eigenen Sender-Thread, StateStream und Socket.IO-Raum;
+    # der Spiel-Thread wartet nie auf Client-Sockets
+    # Alle Spiele werden (im Hintergrund) in ein Binärlog geschrieben, siehe replay.py
+    app.session_log = SessionLog(app.config["SESSION_LOG"]) if app.config["SESSION_LOG"] else None
+    app.stations = StationRegistry(
+        socketio, context=app.app_context, highscore_writer=app.highscore_writer, session_log=app.session_log
+    )
+    # Neue Top-10 sofort an alle Dashboards pushen (stationsübergreifend)
+    leaderboard.on_change(lambda scores: app.stations.everyone.publish("update_highscores", scores), limit=10)
+
+    # Debug-Deltas nur an eingeloggte Admins (Namespace /admin, siehe routes/admin.py)
+    app.debug_stream = AdminDebugStream(lambda event, data: socketio.emit(event, data, namespace="/admin"))
+
+    for index, station_id in enumerate(app.config["STATIONS"]):
         try:
-            with app.app_context():
-                # Wir emittieren an beide Namespaces, damit Dashboard und Remote alles mitbekommen
-                socketio.emit(event, data)  # Global (/)
-                socketio.emit(event, data, namespace="/remote")  # Remote (/remote)
-        except Exception as e:
-            print(f"ERROR beim Emittieren: {e}")
-
-    try:
-        instance = SimonSaysGame(socket_callback=game_socket_callback)
-        app.game_instance = instance
-        game_instance = instance  # Abwärtskompatibilität
-        game_thread = threading.Thread(target=instance.start_game_loop, daemon=True)
-        game_thread.start()
-        print("Hardware-Thread gestartet.")
-    except Exception as exc:
-        print(f"Hardware-Fehler: {exc}")
+            if index == 0:
+                # Die erste Station steuert die GPIO-Hardware und speist die Admin-Ansicht
+                app.stations.create(station_id, debug_stream=app.debug_stream)
+            else:
+                app.stations.add_virtual(station_id)
+        except Exception as exc:
+            log.error("Station %s konnte nicht angelegt werden: %s", station_id, exc)
+
+    default = app.stations.default
+    if default is not None:
+        # Abwärtskompatibilität: Admin-Seiten und ältere Handler sehen die erste Station
+        app.game_instance = game_instance = default.game
+        app.state_stream = default.state_stream
+        app.broadcaster = default.broadcaster
+    app.stations.start()
+    log.info("%d Station(en) gestartet (%s).", len(app.stations), socketio.async_mode)
 
     return app
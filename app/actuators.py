@@ -0,0 +1,92 @@
+import itertools
+import logging
+import threading
+
+from app.clock import system_clock
+
+BUZZER = "buzzer"
+
+log = logging.getLogger(__name__)
+
+
+class ActuatorScheduler:
+    """
+    Zeitplan für alle Aktoren (LEDs + Buzzer) auf den Timern der Uhr.
+
+    Aufrufer reihen nur "an bei t, aus bei t+d" ein und kehren sofort zurück.
+    Überlappende Flashes desselben Aktors werden zu einem Intervall
+    zusammengeführt: das Ende wird verlängert, die LED geht nicht zwischendurch aus.
+    Mit einer VirtualClock schaltet alles deterministisch in simulierter Zeit.
+    """
+
+    def __init__(self, apply, clock=system_clock):
+        # apply(target, state) schaltet den Aktor tatsächlich (läuft im Timer-Thread der Uhr)
+        self._apply = apply
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._ids = itertools.count()
+        self._intervals = {}  # target -> Liste [id, start, end], zeitlich sortiert
+
+    def flash(self, target, duration, at=None):
+        """Schaltet target bei `at` (Default: jetzt) für `duration` Sekunden ein."""
+        start = self.clock.now() if at is None else at
+        end = start + duration
+        with self._lock:
+            intervals = self._intervals.setdefault(target, [])
+            # Alle Intervalle, die sich mit [start, end] überschneiden (play_sequence plant
+            # Flashes im Voraus, ein sofortiger Flash kann also vor dem letzten liegen)
+            overlapping = [iv for iv in intervals if iv[1] <= end and start <= iv[2]]
+            if overlapping:
+                # Zu einem Intervall zusammenführen: das erste bleibt, die übrigen entfallen
+                merged = overlapping[0]
+                for iv in overlapping[1:]:
+                    intervals.remove(iv)
+                new_end = max(end, overlapping[-1][2])
+                if start < merged[1]:
+                    merged[1] = start
+                    self._schedule(start, target, True, merged[0], new_end)
+                if new_end != merged[2]:
+                    merged[2] = new_end
+                    self._schedule(new_end, target, False, merged[0], new_end)
+                return
+
+            interval_id = next(self._ids)
+            position = next((i for i, iv in enumerate(intervals) if iv[1] > start), len(intervals))
+            intervals.insert(position, [interval_id, start, end])
+        self._schedule(start, target, True, interval_id, end)
+        self._schedule(end, target, False, interval_id, end)
+
+    def cancel(self, target):
+        """Verwirft alle geplanten Aktionen für target (Zustand bleibt wie er ist)."""
+        with self._lock:
+            self._intervals.pop(target, None)
+
+    def _schedule(self, when, target, state, interval_id, end):
+        self.clock.call_at(when, lambda: self._fire(target, state, interval_id, end))
+
+    def _is_due(self, target, state, interval_id, end):
+        """Prüft, ob die Schaltaktion noch gilt (nicht abgebrochen, nicht verlängert)."""
+        with self._lock:
+            intervals = self._intervals.get(target)
+            if not intervals:
+                return False
+            current = next((iv for iv in intervals if iv[0] == interval_id), None)
+            if current is None:
+                return False
+            if state:
+                return True
+            if current[2] != end:
+                return False
+            # Nur das jeweils letzte Ende eines Intervalls schaltet aus
+            intervals.remove(current)
+            if not intervals:
+                del self._intervals[target]
+            return True
+
+    def _fire(self, target, state, interval_id, end):
+        if not self._is_due(target, state, interval_id, end):
+            return
+        try:
+            self._apply(target, state)
+        except Exception as exc:
+            log.error("Aktor-Fehler (%s): %s", target, exc)
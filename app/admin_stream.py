@@ -0,0 +1,69 @@
+import copy
+import logging
+import threading
+import time
+
+from app.config import ADMIN_PUSH_RATE
+
+log = logging.getLogger(__name__)
+
+
+class AdminDebugStream:
+    """
+    Debug-Zustand für die Admin-Seite, gepusht statt gepollt.
+
+    Das Spiel meldet Änderungen (LED geschaltet, Taster entprellt, SNES-Flanke,
+    Schwierigkeit) über update(); gelesen wird dabei keine Hardware. Ein
+    Sender-Thread verschickt die gesammelten Änderungen als `debug_delta`,
+    höchstens max_rate Mal pro Sekunde und nur, wenn ein Admin verbunden ist.
+    """
+
+    SECTIONS = ("leds", "buttons", "snes", "game")
+
+    def __init__(self, send, max_rate=ADMIN_PUSH_RATE):
+        # send(event, data) verteilt an den /admin-Namespace (läuft im Sender-Thread)
+        self._send = send
+        self.min_interval = 1.0 / max_rate
+        self._state = {section: {} for section in self.SECTIONS}
+        self._pending = {}
+        self._cond = threading.Condition()
+        self.clients = 0
+        self._thread = threading.Thread(target=self._run, name="admin-stream", daemon=True)
+        self._thread.start()
+
+    def update(self, section, key, value):
+        """Nur echte Änderungen werden vorgemerkt."""
+        with self._cond:
+            current = self._state[section]
+            if current.get(key) == value:
+                return
+            current[key] = value
+            self._pending.setdefault(section, {})[key] = value
+            if self.clients:
+                self._cond.notify()
+
+    def client_connected(self):
+        """Registriert einen Admin und liefert den vollständigen Zustand für ihn."""
+        with self._cond:
+            if not self.clients:
+                # Ohne Zuhörer Angesammeltes steckt schon im Snapshot
+                self._pending = {}
+            self.clients += 1
+            return copy.deepcopy(self._state)
+
+    def client_disconnected(self):
+        with self._cond:
+            self.clients = max(0, self.clients - 1)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not (self._pending and self.clients):
+                    self._cond.wait()
+                delta, self._pending = self._pending, {}
+            try:
+                self._send("debug_delta", delta)
+            except Exception as exc:
+                log.error("Fehler beim Senden des Debug-Deltas: %s", exc)
+            # Ratenbegrenzung: was in der Zwischenzeit passiert, geht gesammelt raus
+            time.sleep(self.min_interval)
@@ -0,0 +1,129 @@
+import logging
+import queue
+import threading
+import time
+
+from app.config import LED_FRAME_WINDOW
+from app.latency import latency, EMIT_QUEUE, EMIT_SEND
+from app.state_stream import delta_for_event
+
+log = logging.getLogger(__name__)
+
+
+class EventBroadcaster:
+    """
+    Ausgehende Spiel-Events über einen eigenen Sender-Thread.
+
+    Der Spiel-Thread legt Events nur in eine Queue und wartet nie auf Clients.
+    LED-Wechsel innerhalb eines kurzen Zeitfensters werden zu einer einzigen
+    `led_frame`-Nachricht zusammengefasst, die nur tatsächliche Änderungen
+    gegenüber dem zuletzt gesendeten Zustand enthält.
+    Zustandsrelevante Events werden im StateStream versioniert und tragen `seq`.
+    """
+
+    def __init__(self, send, context=None, frame_window=LED_FRAME_WINDOW, stream=None, idle_exit=None):
+        # send(event, data) verteilt an alle Namespaces (läuft im Sender-Thread)
+        self._send = send
+        self._context = context
+        self.stream = stream
+        self.frame_window = frame_window
+        # idle_exit: Sekunden ohne Events, nach denen der Sender-Thread endet
+        # (None = läuft dauerhaft); publish() startet ihn bei Bedarf neu
+        self.idle_exit = idle_exit
+        self._queue = queue.SimpleQueue()
+        self._sent_leds = {}
+        self._lock = threading.Lock()
+        self._running = False
+        if idle_exit is None:
+            self._ensure_running()
+
+    def publish(self, event, data):
+        """Nicht-blockierend, kann aus jedem Thread aufgerufen werden."""
+        self._queue.put((event, data, time.monotonic()))
+        if not self._running:
+            self._ensure_running()
+
+    def _ensure_running(self):
+        with self._lock:
+            if self._running:
+                return
+            self._running = True
+        threading.Thread(target=self._run, daemon=True).start()
+
+    # Kompatibel zur bisherigen socket_callback-Signatur
+    __call__ = publish
+
+    def _run(self):
+        if self._context is not None:
+            with self._context():
+                self._loop()
+        else:
+            self._loop()
+
+    def _next(self):
+        if self.idle_exit is None:
+            return self._queue.get()
+        while True:
+            try:
+                return self._queue.get(timeout=self.idle_exit)
+            except queue.Empty:
+                # Unter dem Lock prüfen, damit kein gleichzeitiges publish() liegen bleibt
+                with self._lock:
+                    if self._queue.empty():
+                        self._running = False
+                        return None
+
+    def _loop(self):
+        while True:
+            item = self._next()
+            if item is None:
+                return
+            event, data, published_at = item
+            if event != "led_state":
+                self._deliver(event, data, published_at)
+                continue
+
+            frame = {data["color"]: data["state"]}
+            follow_up = self._collect_frame(frame)
+            self._deliver_frame(frame, published_at)
+            if follow_up is not None:
+                self._deliver(*follow_up)
+
+    def _collect_frame(self, frame):
+        """
+        Sammelt weitere LED-Wechsel bis zum Ende des Fensters.
+        Ein anderes Event beendet den Frame vorzeitig, damit die Reihenfolge erhalten bleibt.
+        """
+        deadline = time.monotonic() + self.frame_window
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            try:
+                event, data, published_at = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                return None
+            if event != "led_state":
+                return event, data, published_at
+            frame[data["color"]] = data["state"]
+
+    def _deliver_frame(self, frame, published_at):
+        changes = {color: state for color, state in frame.items() if self._sent_leds.get(color) != state}
+        if not changes:
+            return
+        self._sent_leds.update(changes)
+        # Wartezeit ab dem ersten LED-Wechsel des Frames (inkl. Sammelfenster)
+        self._deliver("led_frame", {"changes": changes}, published_at)
+
+    def _deliver(self, event, data, published_at):
+        if self.stream is not None:
+            delta = delta_for_event(event, data)
+            if delta is not None:
+                data = dict(data, seq=self.stream.record(delta))
+        started = time.monotonic()
+        latency.record(EMIT_QUEUE, started - published_at)
+        try:
+            self._send(event, data)
+        except Exception as e:
+            log.error("Fehler beim Emittieren von %s: %s", event, e)
+        latency.since(EMIT_SEND, started)
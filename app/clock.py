@@ -0,0 +1,153 @@
+import heapq
+import itertools
+import logging
+import threading
+import time
+
+log = logging.getLogger(__name__)
+
+
+class Timer:
+    """Geplanter Aufruf; cancel() verhindert ihn, solange er noch nicht lief."""
+
+    __slots__ = ("when", "callback", "cancelled")
+
+    def __init__(self, when, callback):
+        self.when = when
+        self.callback = callback
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+def _run_timer(timer):
+    try:
+        timer.callback()
+    except Exception as exc:
+        log.error("Timer-Fehler: %s", exc)
+
+
+class MonotonicClock:
+    """
+    Echte Zeit auf Basis von time.monotonic().
+
+    Alle Timer (call_at) laufen gemeinsam auf einem einzigen Thread, der erst
+    beim ersten Timer gestartet wird. Callbacks müssen kurz sein.
+    """
+
+    virtual = False
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._heap = []  # (zeit, seq, timer)
+        self._seq = itertools.count()
+        self._thread = None
+
+    def now(self):
+        return time.monotonic()
+
+    def sleep(self, seconds):
+        if seconds > 0:
+            time.sleep(seconds)
+
+    def sleep_until(self, deadline):
+        self.sleep(deadline - time.monotonic())
+
+    def wait(self, cond, timeout=None):
+        """Wartet auf cond (der Aufrufer hält den Lock), höchstens timeout Sekunden."""
+        return cond.wait(timeout)
+
+    def call_at(self, when, callback):
+        timer = Timer(when, callback)
+        with self._cond:
+            heapq.heappush(self._heap, (when, next(self._seq), timer))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="clock-timers", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+        return timer
+
+    def call_later(self, delay, callback):
+        return self.call_at(time.monotonic() + delay, callback)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while True:
+                    now = time.monotonic()
+                    if self._heap and self._heap[0][0] <= now:
+                        timer = heapq.heappop(self._heap)[2]
+                        break
+                    self._cond.wait(self._heap[0][0] - now if self._heap else None)
+            if not timer.cancelled:
+                _run_timer(timer)
+
+
+class VirtualClock:
+    """
+    Simulierte Zeit für Tests, Simulation und Replays.
+
+    Die Zeit steht, bis jemand sleep()/sleep_until()/wait() aufruft; dann
+    springt sie direkt zum nächsten Zeitpunkt und führt fällige Timer im
+    aufrufenden Thread aus. Gedacht für einen einzelnen treibenden Thread.
+    """
+
+    virtual = True
+
+    def __init__(self, start=0.0):
+        self._now = start
+        self._heap = []
+        self._seq = itertools.count()
+        self.timers_run = 0
+
+    def now(self):
+        return self._now
+
+    def advance_to(self, deadline):
+        """Führt alle Timer bis einschließlich deadline in Zeitreihenfolge aus."""
+        while self._heap and self._heap[0][0] <= deadline:
+            when, _, timer = heapq.heappop(self._heap)
+            if timer.cancelled:
+                continue
+            self._now = max(self._now, when)
+            self.timers_run += 1
+            _run_timer(timer)
+        self._now = max(self._now, deadline)
+
+    def sleep(self, seconds):
+        self.advance_to(self._now + max(0.0, seconds))
+
+    def sleep_until(self, deadline):
+        self.advance_to(deadline)
+
+    def wait(self, cond, timeout=None):
+        """
+        Statt zu blockieren: bis zum nächsten Timer (der z.B. eine Eingabe
+        einreiht) oder bis zum Timeout vorspulen. Der Aufrufer prüft danach
+        seine Bedingung erneut - wie nach einem echten Condition.wait().
+        """
+        deadline = None if timeout is None else self._now + timeout
+        while self._heap and self._heap[0][2].cancelled:
+            heapq.heappop(self._heap)
+        if self._heap:
+            next_timer = self._heap[0][0]
+            if deadline is None or next_timer <= deadline:
+                self.advance_to(next_timer)
+                return True
+        if deadline is None:
+            raise RuntimeError("Simulation hängt: Warten ohne Timeout und ohne geplante Ereignisse")
+        self.advance_to(deadline)
+        return False
+
+    def call_at(self, when, callback):
+        timer = Timer(when, callback)
+        heapq.heappush(self._heap, (when, next(self._seq), timer))
+        return timer
+
+    def call_later(self, delay, callback):
+        return self.call_at(self._now + delay, callback)
+
+
+# Prozessweite Uhr für den Normalbetrieb (ein gemeinsamer Timer-Thread)
+system_clock = MonotonicClock()
@@ -61,6 +61,20 @@ BUZZER_PIN = 6
 FLASH_DELAY = 0.5
 SEQUENCE_PAUSE = 0.3
 
+# Feste Abläufe im Spiel (Sekunden)
+GAME_START_DELAY = 0.8  # nach "GO!"
+SEQUENCE_START_DELAY = 0.8  # nach "Simon zeigt..." bis zum ersten Flash
+ROUND_PAUSE = 0.4  # zwischen zwei Runden
+GAME_OVER_BLINK = 0.2  # an/aus beim Game-Over-Blinken
+GAME_OVER_BLINKS = 3
+WAVE_STEP = 0.15  # Lauflicht im Startbildschirm
+NAME_TIMEOUT = 30  # Wartezeit auf die Namenseingabe
+
+# Highscores vor dem Eintragen gegen Seed und Eingabeprotokoll prüfen (app/verify.py)
+VERIFY_HIGHSCORES = os.environ.get('VERIFY_HIGHSCORES', '1') != '0'
+# Schneller kann kein Mensch zwei Eingaben machen (Sekunden)
+VERIFY_MIN_PRESS_INTERVAL = float(os.environ.get('VERIFY_MIN_PRESS_INTERVAL', '0.05'))
+
 # Schwierigkeitsstufen für die Flask-Erweiterung
 DIFFICULTY_SETTINGS = {
     "easy": {
@@ -78,6 +92,28 @@ DIFFICULTY_SETTINGS = {
 }
 
 
+# Server-Modus für Flask-SocketIO: threading (Werkzeug, nur Entwicklung) | eventlet | gevent
+ASYNC_MODES = ("threading", "eventlet", "gevent")
+ASYNC_MODE = os.environ.get('SIMON_ASYNC_MODE', 'threading').lower()
+
+# Stationen (Automaten) in einem Serverprozess, kommagetrennt. Die erste nutzt die
+# GPIO-Hardware, alle weiteren sind reine Web-Stationen, z.B. SIMON_STATIONS="main,web1,web2"
+STATIONS = [s.strip() for s in os.environ.get('SIMON_STATIONS', 'main').split(',') if s.strip()] or ['main']
+# Sender-Thread einer Web-Station endet nach so vielen Sekunden ohne Events
+STATION_IDLE_EXIT = float(os.environ.get('STATION_IDLE_EXIT', '10'))
+
+# Zeitfenster (Sekunden), in dem LED-Wechsel zu einem led_frame gebündelt werden
+LED_FRAME_WINDOW = float(os.environ.get('LED_FRAME_WINDOW', '0.02'))
+
+# Anzahl der letzten Zustands-Deltas, die für Reconnects vorgehalten werden
+STATE_HISTORY_SIZE = int(os.environ.get('STATE_HISTORY_SIZE', '256'))
+
+# Eingabe-Puffer pro Quelle (Hardware, Web, SNES)
+# Policy beim Überlauf: drop_oldest | drop_newest | coalesce
+INPUT_QUEUE_SIZE = int(os.environ.get('INPUT_QUEUE_SIZE', '32'))
+INPUT_OVERFLOW_POLICY = os.environ.get('INPUT_OVERFLOW_POLICY', 'coalesce')
+
+
 # Physische Knöpfe für Schwierigkeitsgrad
 DIFFICULTY_BUTTONS = {
     "easy": 12,
@@ -92,6 +128,22 @@ SNES_PINS = {
     "DATA": 10
 }
 
+# Abtastrate des SNES-Samplers (ein Lesevorgang pro Frame)
+SNES_SAMPLE_RATE = float(os.environ.get('SNES_SAMPLE_RATE', '60'))
+
+# Maximale Push-Rate der Admin-Debugansicht (Deltas pro Sekunde)
+ADMIN_PUSH_RATE = float(os.environ.get('ADMIN_PUSH_RATE', '10'))
+
+# Entprellung der Taster (Sekunden)
+# bounce: Flanken nach einer akzeptierten Flanke werden so lange ignoriert
+# hold:   so lange muss ein Druck anliegen, damit er zählt (Glitch-Filter)
+BUTTON_BOUNCE_TIME = float(os.environ.get('BUTTON_BOUNCE_TIME', '0.03'))
+BUTTON_HOLD_TIME = float(os.environ.get('BUTTON_HOLD_TIME', '0.005'))
+# Abweichende Fenster pro GPIO-Pin, z.B. {13: {"bounce": 0.08}} für einen ausgeleierten Taster
+DEBOUNCE_OVERRIDES = {}
+# Der SNES-Sampler filtert durch die Abtastung schon selbst (1 Frame = ~16 ms)
+SNES_DEBOUNCE = {"bounce": 0.02, "hold": 0.0}
+
 # Mapping: Welcher SNES-Button macht was im Spiel?
 SNES_MAPPING = {
     "Y": "green",
@@ -105,4 +157,41 @@ SNES_MAPPING = {
 import os
 basedir = os.path.abspath(os.path.dirname(__file__))
 SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///' + os.path.join(basedir, 'simon.db')
-SQLALCHEMY_TRACK_MODIFICATIONS = False
\ No newline at end of file
+SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+# Anzahl der Highscores, die im Speicher vorgehalten werden (Top-K)
+LEADERBOARD_CACHE_SIZE = int(os.environ.get('LEADERBOARD_CACHE_SIZE', '100'))
+
+# Write-Behind für Highscores: Batch-Größe, max. Wartezeit bis zum Flush, Wiederholungen bei Lock
+HIGHSCORE_BATCH_SIZE = int(os.environ.get('HIGHSCORE_BATCH_SIZE', '32'))
+HIGHSCORE_FLUSH_INTERVAL = float(os.environ.get('HIGHSCORE_FLUSH_INTERVAL', '0.5'))
+HIGHSCORE_MAX_RETRIES = int(os.environ.get('HIGHSCORE_MAX_RETRIES', '5'))
+
+# SQLite-Verbindungspool (WAL, synchronous=NORMAL)
+DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', '8'))
+SQLITE_BUSY_TIMEOUT = float(os.environ.get('SQLITE_BUSY_TIMEOUT', '5.0'))
+SQLITE_STATEMENT_CACHE = 64
+
+# Logging-Konfiguration
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO').upper()
+LOG_CONSOLE_LEVEL = os.environ.get('LOG_CONSOLE_LEVEL', 'WARNING').upper()
+LOG_FILE = os.environ.get('LOG_FILE') or os.path.join(basedir, '..', 'logs', 'simon.log')
+LOG_MAX_BYTES = int(os.environ.get('LOG_MAX_BYTES', str(1024 * 1024)))
+LOG_BACKUP_COUNT = int(os.environ.get('LOG_BACKUP_COUNT', '3'))
+
+# Aufzeichnung aller Spiele als Binärlog (siehe app/recorder.py, Replay: replay.py).
+# Nur mit gesetztem Pfad, z.B. SESSION_LOG=logs/sessions.simrec (SD-Karte schonen)
+SESSION_LOG = os.environ.get('SESSION_LOG', '')
+# Rotation wie beim Textlog: ab dieser Größe beginnt mit der nächsten Partie eine neue Datei
+SESSION_LOG_MAX_BYTES = int(os.environ.get('SESSION_LOG_MAX_BYTES', str(10 * 1024 * 1024)))
+SESSION_LOG_BACKUP_COUNT = int(os.environ.get('SESSION_LOG_BACKUP_COUNT', '3'))
+SESSION_LOG_FLUSH_INTERVAL = float(os.environ.get('SESSION_LOG_FLUSH_INTERVAL', '1.0'))
+# Alle n Records ein Index-Block mit absolutem Zeitstempel (Einstiegspunkt für Leser)
+SESSION_LOG_INDEX_EVERY = 512
+# Paket-Logging von Socket.IO/Engine.IO (jedes Paket!) nur zur Fehlersuche einschalten
+LOG_SOCKETIO = os.environ.get('LOG_SOCKETIO', '0') == '1'
+# Sampling pro Event-Typ: nur jedes n-te Record wird geschrieben
+LOG_SAMPLING = {
+    "remote_input": 20,
+    "client_connect": 10,
+}
\ No newline at end of file
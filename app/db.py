@@ -1,36 +1,162 @@
+import atexit
 import os
+import queue
 import sqlite3
+import threading
+from contextlib import contextmanager
 from flask import current_app, g
 
+from app.config import DB_POOL_SIZE, SQLITE_BUSY_TIMEOUT, SQLITE_STATEMENT_CACHE
+
+_pool = None
+_pool_lock = threading.Lock()
+
+# Versionierte Schema-Migrationen. Der Index in der Liste + 1 ist die Version,
+# die nach dem Anwenden in PRAGMA user_version steht. Nur hinten anhängen!
+MIGRATIONS = [
+    # 1: Basistabelle
+    [
+        """
+        CREATE TABLE IF NOT EXISTS highscore (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            score INTEGER NOT NULL,
+            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+    ],
+    # 2: Index für Top-N (ORDER BY score DESC, timestamp ohne Sortierung)
+    [
+        "CREATE INDEX IF NOT EXISTS idx_highscore_score ON highscore (score DESC, timestamp)",
+    ],
+    # 3: Zusatzinfos pro Spiel
+    [
+        "ALTER TABLE highscore ADD COLUMN difficulty TEXT",
+        "ALTER TABLE highscore ADD COLUMN station TEXT",
+        "ALTER TABLE highscore ADD COLUMN sequence_length INTEGER",
+        "ALTER TABLE highscore ADD COLUMN duration_ms INTEGER",
+    ],
+    # 4: Keyset-Pagination (score, id), gefiltert nach Schwierigkeit bzw. Spieler
+    [
+        "CREATE INDEX IF NOT EXISTS idx_highscore_keyset ON highscore (score DESC, id)",
+        "CREATE INDEX IF NOT EXISTS idx_highscore_difficulty ON highscore (difficulty, score DESC, id)",
+        "CREATE INDEX IF NOT EXISTS idx_highscore_name ON highscore (name, score DESC, id)",
+    ],
+]
+
+
+class ConnectionPool:
+    """
+    Kleiner Pool persistenter SQLite-Verbindungen.
+
+    Verbindungen werden pro App-Context (bzw. pro Aufrufer) ausgeliehen und
+    danach zurückgegeben, statt jedes Mal neu verbunden zu werden. Dadurch
+    bleibt auch der Statement-Cache jeder Verbindung erhalten. WAL erlaubt
+    parallele Leser, während das Spiel schreibt.
+    """
+
+    def __init__(self, path, size=DB_POOL_SIZE):
+        self.path = path
+        self._idle = queue.LifoQueue(maxsize=size)
+
+    def _connect(self):
+        conn = sqlite3.connect(
+            self.path,
+            timeout=SQLITE_BUSY_TIMEOUT,
+            cached_statements=SQLITE_STATEMENT_CACHE,
+            # Eine Verbindung wird immer nur von einem Thread gleichzeitig benutzt,
+            # kann aber nach Rückgabe von einem anderen ausgeliehen werden.
+            check_same_thread=False,
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA busy_timeout={int(SQLITE_BUSY_TIMEOUT * 1000)}")
+        return conn
+
+    def acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return self._connect()
+
+    def release(self, conn):
+        if conn.in_transaction:
+            conn.rollback()
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    @contextmanager
+    def connection(self):
+        """Für Threads ohne Flask-Context (z.B. Hintergrund-Worker)."""
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def close_all(self):
+        """Schließt die freien Verbindungen (beim Beenden des Prozesses)."""
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+def get_pool():
+    """Liefert den prozessweiten Pool (wird beim ersten Zugriff angelegt)."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                db_path = os.path.join(current_app.root_path, '..', 'simon.db')
+                _pool = ConnectionPool(os.path.abspath(db_path))
+                # Nach dem HighscoreWriter (atexit: umgekehrte Reihenfolge) alle Verbindungen schließen
+                atexit.register(_pool.close_all)
+    return _pool
+
+
 def get_db():
-    """Initialisiert die Verbindung zur SQLite-Datenbank."""
+    """Leiht eine Verbindung aus dem Pool für den aktuellen App-Context aus."""
     if 'db' not in g:
-        db_path = os.path.join(current_app.root_path, '..', 'simon.db')
-        g.db = sqlite3.connect(db_path)
-        g.db.row_factory = sqlite3.Row
+        g.db = get_pool().acquire()
         g.db_type = 'sqlite'
     return g.db
 
 def close_db(e=None):
-    """Schließt die Datenbank-Verbindung am Ende des Requests."""
+    """Gibt die Datenbank-Verbindung am Ende des Requests an den Pool zurück."""
     db = g.pop('db', None)
     if db is not None:
-        db.close()
+        get_pool().release(db)
+
+def migrate(db):
+    """
+    Bringt das Schema auf den neuesten Stand. Jede Migration läuft in einer
+    eigenen Transaktion zusammen mit dem Hochzählen von user_version.
+    Gibt die erreichte Schema-Version zurück.
+    """
+    version = db.execute("PRAGMA user_version").fetchone()[0]
+    for target, statements in enumerate(MIGRATIONS, start=1):
+        if target <= version:
+            continue
+        try:
+            db.execute("BEGIN IMMEDIATE")
+            for statement in statements:
+                db.execute(statement)
+            db.execute(f"PRAGMA user_version = {target}")
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        version = target
+    return version
 
 def init_db():
-    """Erstellt die Tabellen, falls sie noch nicht existieren."""
-    db = get_db()
-    cursor = db.cursor()
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS highscore (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL,
-            score INTEGER NOT NULL,
-            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
-    db.commit()
-    cursor.close()
+    """Erstellt die Tabellen bzw. migriert sie auf die aktuelle Schema-Version."""
+    return migrate(get_db())
 
 def init_app(app):
     """Registriert DB-Funktionen bei der Flask-App."""
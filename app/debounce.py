@@ -0,0 +1,142 @@
+import logging
+import threading
+
+from app.clock import system_clock
+from app.config import BUTTON_BOUNCE_TIME, BUTTON_HOLD_TIME, DEBOUNCE_OVERRIDES
+
+log = logging.getLogger(__name__)
+
+
+class _PinState:
+    __slots__ = ("bounce", "hold", "raw", "raw_at", "stable", "locked_until", "pending")
+
+    def __init__(self, bounce, hold):
+        self.bounce = bounce
+        self.hold = hold
+        self.raw = False
+        self.raw_at = 0.0
+        self.stable = False
+        self.locked_until = 0.0
+        self.pending = False
+
+
+class Debouncer:
+    """
+    Zeitbasierter Entprell- und Glitch-Filter für alle Eingänge.
+
+    Rohe Flanken (gpiozero-Callbacks, SNES-Sampler) gehen über feed() hinein,
+    saubere Drücken/Loslassen-Ereignisse kommen über on_event(key, pressed,
+    timestamp) heraus. Pro Eingang gibt es zwei Fenster:
+
+    - hold: so lange muss ein Druck stabil anliegen, bevor er zählt
+      (kurze Störimpulse auf der Leitung werden verworfen)
+    - bounce: nach jeder akzeptierten Flanke werden weitere Flanken so lange
+      als Prellen ignoriert; danach wird der tatsächliche Pegel nachgeprüft
+
+    Die Nachprüfungen laufen als Timer der Uhr (kein eigener Thread).
+    """
+
+    def __init__(
+        self,
+        on_event,
+        bounce=BUTTON_BOUNCE_TIME,
+        hold=BUTTON_HOLD_TIME,
+        overrides=DEBOUNCE_OVERRIDES,
+        clock=system_clock,
+    ):
+        self._on_event = on_event
+        self.bounce = bounce
+        self.hold = hold
+        self._overrides = overrides
+        self.clock = clock
+        self._pins = {}
+        self._lock = threading.Lock()
+        self.filtered = 0  # verworfene Rohflanken (Prellen, Störimpulse)
+
+    def add(self, key, bounce=None, hold=None, pin=None):
+        """
+        Registriert einen Eingang. Fenster-Priorität: explizite Werte, dann
+        DEBOUNCE_OVERRIDES[pin] bzw. [key], dann die globalen Defaults.
+        """
+        override = self._overrides.get(pin, self._overrides.get(key, {}))
+        self._pins[key] = _PinState(
+            bounce if bounce is not None else override.get("bounce", self.bounce),
+            hold if hold is not None else override.get("hold", self.hold),
+        )
+
+    def bind_button(self, button, key, pin=None, **windows):
+        """Hängt den Filter zwischen einen gpiozero-Button und on_event."""
+        self.add(key, pin=pin, **windows)
+        button.when_pressed = lambda: self.feed(key, True)
+        button.when_released = lambda: self.feed(key, False)
+
+    def is_pressed(self, key):
+        """Entprellter Zustand (nicht der Rohpegel)."""
+        state = self._pins.get(key)
+        return state is not None and state.stable
+
+    def feed(self, key, level, timestamp=None):
+        """Rohe Flanke eines Eingangs."""
+        now = self.clock.now() if timestamp is None else timestamp
+        emit = None
+        with self._lock:
+            state = self._pins[key]
+            state.raw = level
+            state.raw_at = now
+            if state.pending:
+                # Nachprüfung ist schon geplant und liest den neuesten Pegel
+                self.filtered += 1
+                return
+            if level == state.stable:
+                return
+            if now < state.locked_until:
+                self.filtered += 1
+                self._schedule(state, key, state.locked_until)
+            elif level and state.hold > 0:
+                self._schedule(state, key, now + state.hold)
+            else:
+                emit = self._accept(state, level, now)
+        if emit:
+            self._emit(key, *emit)
+
+    def stats(self):
+        return {"inputs": len(self._pins), "filtered": self.filtered}
+
+    def _schedule(self, state, key, when):
+        state.pending = True
+        self.clock.call_at(when, lambda: self._on_timer(key))
+
+    def _accept(self, state, level, timestamp):
+        state.stable = level
+        state.locked_until = timestamp + state.bounce
+        return level, timestamp
+
+    def _check(self, key, now):
+        """Nachprüfung nach Ablauf eines Fensters; liefert ein Ereignis oder None."""
+        state = self._pins[key]
+        state.pending = False
+        if state.raw == state.stable:
+            return None  # nur Prellen bzw. Störimpuls, Pegel ist wieder der alte
+        if now < state.locked_until:
+            self._schedule(state, key, state.locked_until)
+            return None
+        held_until = state.raw_at + state.hold
+        if state.raw and now < held_until:
+            # Erst seit kurzem gedrückt -> bis zum Ende des Hold-Fensters warten
+            # (gleicher Ausdruck wie der Timer, sonst kippt die Rundung)
+            self._schedule(state, key, held_until)
+            return None
+        # Zeitpunkt der (letzten) echten Flanke, nicht der Nachprüfung
+        return self._accept(state, state.raw, state.raw_at)
+
+    def _emit(self, key, pressed, timestamp):
+        try:
+            self._on_event(key, pressed, timestamp)
+        except Exception as exc:
+            log.error("Eingabe-Fehler (%s): %s", key, exc)
+
+    def _on_timer(self, key):
+        with self._lock:
+            event = self._check(key, self.clock.now())
+        if event:
+            self._emit(key, *event)
@@ -1,345 +1,421 @@
-import time
 import random
+import logging
 import threading
-
-from gpiozero import LED, Button, Buzzer, Device, DigitalOutputDevice, DigitalInputDevice
-from gpiozero.exc import BadPinFactory
-from gpiozero.pins.mock import MockFactory
+import time
 
 from app.config import (
     HARDWARE_SETUP,
-    BUZZER_PIN,
     FLASH_DELAY,
     SEQUENCE_PAUSE,
-    IS_RASPI,
     DIFFICULTY_SETTINGS,
     DIFFICULTY_BUTTONS,
-    SNES_PINS,
     SNES_MAPPING,
+    SNES_DEBOUNCE,
+    GAME_START_DELAY,
+    SEQUENCE_START_DELAY,
+    ROUND_PAUSE,
+    GAME_OVER_BLINK,
+    GAME_OVER_BLINKS,
+    WAVE_STEP,
+    NAME_TIMEOUT,
+    VERIFY_HIGHSCORES,
 )
+from app.hardware import GpioBoard
+from app.input_engine import InputEngine, SOURCE_HARDWARE, SOURCE_WEB, SOURCE_SNES
+from app.snes import SnesSampler, SNES_BUTTON_NAMES, ALL_BITS
+from app.actuators import ActuatorScheduler, BUZZER
+from app.debounce import Debouncer
+from app.clock import system_clock
+from app.latency import latency, LatencyTracker, PRESS_TO_LED, INPUT_WAIT, SOCKET_TO_INPUT
+from app.metrics import GAMES_STARTED, GAMES_FINISHED, SEQUENCE_LENGTH, ROUND_SECONDS, HIGHSCORES_REJECTED
+from app import recorder as rec
+from app.sequence import PackedSequence
+from app.verify import Transcript, verify
 
+# Debouncer-Schlüssel der Schwierigkeitstaster
+DIFFICULTY_INPUT = "difficulty"
 
-# Lokaler Mock-Import, falls wir nicht auf dem Pi sind
-if not IS_RASPI:
-    print("Versuche mock_gpio_gui zu laden...")
-    try:
-        from mock_gpio_gui import LED, Button, Buzzer, Device, DigitalOutputDevice, DigitalInputDevice
-
-        print("GUI-Emulator geladen.")
-    except ImportError as e:
-        print(f"Fehler beim Laden von mock_gpio_gui: {e}")
-        try:
-            Device.pin_factory = MockFactory()
-        except Exception:
-            pass
-
-
-class SilentBuzzer:
-    def on(self):
-        pass
-
-    def off(self):
-        pass
-
-
-def ensure_gpio_factory():
-    """Nutzt echte GPIOs auf dem Pi, sonst Mock für lokale/dev Umgebungen."""
-    try:
-        Device.ensure_pin_factory()
-    except BadPinFactory:
-        Device.pin_factory = MockFactory()
-    except Exception:
-        # Bei alternativen Mock-Devices (z.B. GUI) kann ensure_pin_factory fehlen.
-        try:
-            Device.pin_factory = MockFactory()
-        except Exception:
-            pass
+log = logging.getLogger(__name__)
 
 
 class SimonSaysGame:
-    def __init__(self, socket_callback=None):
-        ensure_gpio_factory()
-
-        self.sequence = []
-        self.leds = {}
-        self.buttons = {}
+    def __init__(
+        self,
+        socket_callback=None,
+        highscore_writer=None,
+        debug_stream=None,
+        clock=None,
+        rng=None,
+        board=None,
+        station=None,
+        recorder=None,
+        latency_tracker=None,
+    ):
+        # clock/rng/board sind für Simulation und Tests austauschbar (siehe app/simulation.py)
+        # station: Kennung des Automaten (siehe app/stations.py), landet mit im Highscore
+        self.station = station
+        self.clock = clock or system_clock
+        # Spiele auf virtueller Zeit (Simulation, Replay) messen in einen eigenen Tracker
+        # und schreiben keine Metriken - sonst landen ihre Zeiten in /admin/latency und /metrics
+        self.latency = latency_tracker or (LatencyTracker() if self.clock.virtual else latency)
+        self._metrics = not self.clock.virtual
+        # Ohne eigenen rng das globale random-Modul: ein random.Random() pro Spiel
+        # kostet ~2,5 KB Zustand, gebraucht wird davon nur ein Seed pro Partie
+        self.rng = rng or random
+        # Ohne Angabe die GPIO-Hardware; VirtualBoard (app/hardware.py) für reine Web-Spiele
+        self.board = board if board is not None else GpioBoard()
+
+        # Farbfolge: 2 Bit pro Schritt, aus (seed, Länge) reproduzierbar (app/sequence.py)
+        self.sequence = PackedSequence()
+        # Eingabeprotokoll der laufenden Partie, Grundlage der Highscore-Prüfung (app/verify.py)
+        self.transcript = Transcript(0)
+        self.leds = self.board.leds
+        self.buttons = self.board.buttons
+        self.buzzer = self.board.buzzer
         self.colors = list(HARDWARE_SETUP.keys())
         self.socket_callback = socket_callback
-
-        try:
-            self.buzzer = Buzzer(BUZZER_PIN)
-        except Exception:
-            self.buzzer = SilentBuzzer()
+        # Push-Debugansicht für /admin (optional)
+        self.debug_stream = debug_stream
+        # Write-Behind für Highscores; ohne Writer wird synchron gespeichert
+        self.highscore_writer = highscore_writer
+        # Aufzeichnung (SessionRecorder aus app/recorder.py), nur während eines Spiels aktiv
+        self.recorder = recorder
+        self._recording = False
 
         self.flash_delay = FLASH_DELAY
         self.sequence_pause = SEQUENCE_PAUSE
         self.current_difficulty = "medium"
         self.current_score = 0
-
-        self.remote_inputs = []
-        self.remote_input_lock = threading.Lock()
+        self.game_started_at = None
+        self.game_duration_ms = None
+        # Namen werden nur angenommen, solange wait_for_name_input läuft
+        self._awaiting_name = False
+        self._name_lock = threading.Lock()
+        # Zeitstempel und Quelle der zuletzt angenommenen Farbeingabe (Flanke bzw. Empfang, nicht Verarbeitung)
+        self._input_at = None
+        self._input_source = None
+
+        self.input_engine = InputEngine(clock=self.clock, sources=self.board.input_sources)
+        # Alle Taster (und der SNES-Controller) laufen durch denselben Entprell-Filter
+        self.debouncer = Debouncer(self._on_clean_input, clock=self.clock)
+        if SOURCE_SNES in self.board.input_sources:
+            for name in SNES_BUTTON_NAMES:
+                if name != "-":
+                    self.debouncer.add((SOURCE_SNES, name, SNES_MAPPING.get(name)), **SNES_DEBOUNCE)
         self.game_running = False
+        # Virtuelle Boards: Spiel-Thread nur während einer Partie (siehe start_on_demand)
+        self._spawn = None
+        self._session_active = False
+        self._session_lock = threading.Lock()
         self.led_states = {color: "off" for color in self.colors}
-
-        # Hardware initialisieren
-        for color, pins in HARDWARE_SETUP.items():
-            self.leds[color] = LED(pins["led"])
-            self.buttons[color] = Button(pins["btn"], pull_up=True)
-
-        # Difficulty Buttons
-        self.diff_btns = []
-        for level, pin in DIFFICULTY_BUTTONS.items():
-            try:
-                btn = Button(pin, pull_up=True)
-                btn.when_pressed = lambda l=level: self.set_difficulty(l)
-                self.diff_btns.append(btn)
-            except Exception:
-                pass
+        # Serialisiert Schaltvorgänge von Spiel-Thread und Aktor-Scheduler
+        self._actuator_lock = threading.RLock()
+        self.actuators = ActuatorScheduler(self._apply_actuator, clock=self.clock)
+        # Empfangszeit von Web-Eingaben je Farbe, bis der Scheduler die LED einschaltet
+        self._led_requested_at = {}
+
+        # Taster des Boards (ein VirtualBoard hat keine) hängen am Debouncer
+        for color, button in self.buttons.items():
+            self.debouncer.bind_button(button, (SOURCE_HARDWARE, color), pin=HARDWARE_SETUP[color]["btn"])
+        for level, button in self.board.difficulty_buttons.items():
+            self.debouncer.bind_button(button, (DIFFICULTY_INPUT, level), pin=DIFFICULTY_BUTTONS[level])
 
         # SNES Controller
         self.snes_enabled = False
-        if IS_RASPI:
+        self.snes_sampler = None
+        self.snes_button_names = SNES_BUTTON_NAMES
+        if self.board.snes is not None:
             try:
-                self.snes_latch = DigitalOutputDevice(SNES_PINS["LATCH"])
-                self.snes_clock = DigitalOutputDevice(SNES_PINS["CLOCK"])
-                self.snes_data = DigitalInputDevice(SNES_PINS["DATA"], pull_up=True)
+                self.snes_sampler = SnesSampler(*self.board.snes, self._feed_snes_edge)
                 self.snes_enabled = True
 
-                # Check for ghosting
-                test = self.read_snes_controller()
-                if all(b == 0 for b in test):
-                    print("SNES Ghosting erkannt -> deaktiviert.")
+                # Check for ghosting (alle 16 Bits "gedrückt" = Datenleitung hängt auf LOW)
+                if self.read_snes_controller() == ALL_BITS:
+                    log.warning("SNES Ghosting erkannt -> deaktiviert.")
                     self.snes_enabled = False
             except Exception:
                 self.snes_enabled = False
 
-        self.snes_button_names = [
-            "B",
-            "Y",
-            "SELECT",
-            "START",
-            "UP",
-            "DOWN",
-            "LEFT",
-            "RIGHT",
-            "A",
-            "X",
-            "L",
-            "R",
-            "-",
-            "-",
-            "-",
-            "-",
-        ]
+        if self.snes_enabled:
+            # Ab jetzt liest nur noch der Sampler-Thread das Schieberegister
+            self.snes_sampler.start()
+
+        # Ausgangszustand für die Admin-Ansicht, danach nur noch Änderungen
+        for color in self.colors:
+            self._debug("leds", color, self.led_states[color])
+            self._debug("buttons", color, "released")
+        self._debug("game", "diff", self.current_difficulty)
+        self._debug("game", "snes_enabled", self.snes_enabled)
 
         self._print_hardware_report()
 
     def _print_hardware_report(self):
-        print("\n--- SIMON SAYS HW ---")
-        print(f"Modus: {'PI' if IS_RASPI else 'MOCK'}")
-        print(f"SNES: {'AN' if self.snes_enabled else 'AUS'}")
-        print("---------------------\n")
+        log.info(
+            "SIMON SAYS HW - Modus: %s, SNES: %s",
+            self.board.mode,
+            "AN" if self.snes_enabled else "AUS",
+        )
 
     def _emit(self, event, data):
         if self.socket_callback:
             self.socket_callback(event, data)
 
+    def _debug(self, section, key, value):
+        if self.debug_stream is not None:
+            self.debug_stream.update(section, key, value)
+
+    def _record(self, kind, *fields, timestamp=None):
+        """Nicht-blockierend: der Recorder reiht nur ein, geschrieben wird im Hintergrund."""
+        if self._recording:
+            self.recorder.record(kind, self.clock.now() if timestamp is None else timestamp, *fields)
+
     def _set_led_state(self, color, state):
         led_state = "on" if state else "off"
-        self.led_states[color] = led_state
-        if state:
-            self.leds[color].on()
-        else:
-            self.leds[color].off()
+        with self._actuator_lock:
+            self.led_states[color] = led_state
+            if state:
+                self.leds[color].on()
+            else:
+                self.leds[color].off()
+        # Offene Web-Eingabe: "an" misst die Latenz, "aus" verwirft sie (LED war schon an)
+        requested_at = self._led_requested_at.pop(color, None)
+        if state and requested_at is not None:
+            self.latency.record(PRESS_TO_LED, self.clock.now() - requested_at)
         self._emit("led_state", {"color": color, "state": led_state})
+        self._debug("leds", color, led_state)
+        self._record(rec.LED, color, state)
+
+    def _set_buzzer(self, state):
+        with self._actuator_lock:
+            try:
+                if state:
+                    self.buzzer.on()
+                else:
+                    self.buzzer.off()
+            except Exception:
+                pass
+
+    def _apply_actuator(self, target, state):
+        """Wird vom ActuatorScheduler aufgerufen."""
+        if target == BUZZER:
+            self._set_buzzer(state)
+        else:
+            self._set_led_state(target, state)
+
+    def schedule_flash(self, color, duration=None, buzzer=True, at=None):
+        """Nicht-blockierender Flash über den Aktor-Scheduler (sofort oder zum Zeitpunkt `at`)."""
+        duration = self.flash_delay if duration is None else duration
+        self.actuators.flash(color, duration, at=at)
+        if buzzer:
+            self.actuators.flash(BUZZER, duration, at=at)
 
     def get_led_snapshot(self):
         """Liefert den aktuell bekannten LED-Zustand für neue Clients."""
         return dict(self.led_states)
 
+    def apply_difficulty(self, level):
+        """Nur die Timings der Stufe übernehmen (ohne Events und Feedback, z.B. für Replays)."""
+        cfg = DIFFICULTY_SETTINGS[level]
+        self.flash_delay = cfg["flash"]
+        self.sequence_pause = cfg["pause"]
+        self.current_difficulty = level
+
     def set_difficulty(self, level):
         """Ändert Schwierigkeit und gibt LED-Feedback (G=Easy, Y=Mid, R=Hard)."""
         if level in DIFFICULTY_SETTINGS:
-            print(f"Difficulty set to: {level}")
-            cfg = DIFFICULTY_SETTINGS[level]
-            self.flash_delay = cfg["flash"]
-            self.sequence_pause = cfg["pause"]
-            self.current_difficulty = level
+            log.info("Difficulty set to: %s", level)
+            self.apply_difficulty(level)
             self._emit("difficulty_changed", {"level": level})
+            self._debug("game", "diff", level)
+            self._record(rec.DIFFICULTY, level)
 
             # LED Feedback (Leicht=Grün, Mittel=Gelb, Schwer=Rot)
             fb = {"easy": "green", "medium": "yellow", "hard": "red"}.get(level)
             if fb:
-                threading.Thread(target=self.flash_led, args=(fb,), daemon=True).start()
+                self.actuators.flash(fb, self.flash_delay)
 
-            if hasattr(self, "buzzer"):
-                try:
-                    self.buzzer.on()
-                    time.sleep(0.1)
-                    self.buzzer.off()
-                except Exception:
-                    pass
+            self.actuators.flash(BUZZER, 0.1)
 
     def read_snes_controller(self):
-        if not self.snes_enabled:
-            return [1] * 16
-        bits = []
-        self.snes_latch.on()
-        time.sleep(0.00001)
-        self.snes_latch.off()
-        for _ in range(16):
-            bits.append(0 if self.snes_data.is_active else 1)
-            self.snes_clock.on()
-            time.sleep(0.00001)
-            self.snes_clock.off()
-        return bits
-
-    def handle_snes_special_buttons(self):
-        """Prüft SELECT (Restart), L/R (Difficulty)."""
-        if not self.snes_enabled:
-            return False
-        pressed = []
-        bits = self.read_snes_controller()
-        for i, bit in enumerate(bits):
-            if bit == 0 and i < len(self.snes_button_names):
-                pressed.append(self.snes_button_names[i])
-
-        if len(pressed) > 10:
-            return False  # Ghosting
+        """Einzelner Lesevorgang als Bitmaske (nur für Ghosting-Check/Debug, nicht im Spielablauf)."""
+        if self.snes_sampler is None:
+            return 0
+        return self.snes_sampler.read_frame()
+
+    def _on_clean_input(self, key, pressed, timestamp):
+        """Entprellte Ereignisse aus dem Debouncer an die zuständige Stelle verteilen."""
+        kind = key[0]
+        if kind == SOURCE_HARDWARE:
+            self._record(rec.INPUT, SOURCE_HARDWARE, key[1], pressed, timestamp=timestamp)
+            self.input_engine.push(SOURCE_HARDWARE, key[1], pressed, timestamp=timestamp)
+            self._debug("buttons", key[1], "pressed" if pressed else "released")
+        elif kind == DIFFICULTY_INPUT:
+            if pressed:
+                self.set_difficulty(key[1])
+        elif kind == SOURCE_SNES:
+            self._record(rec.INPUT, SOURCE_SNES, key[1], pressed, timestamp=timestamp)
+            self._debug("snes", key[1], pressed)
+            self._on_snes_edge(key[1], key[2], pressed, timestamp)
+
+    def _feed_snes_edge(self, name, target, pressed):
+        self.debouncer.feed((SOURCE_SNES, name, target), pressed)
+
+    def _on_snes_edge(self, name, target, pressed, timestamp=None):
+        """Flanken vom SNES-Sampler-Thread: SELECT (Restart), L/R (Difficulty), Rest als Eingabe."""
+        if not pressed:
+            if target is not None:
+                self.input_engine.push(SOURCE_SNES, target, False, timestamp=timestamp)
+            return
 
         # 1. SELECT -> RESTART
-        if "SELECT" in pressed:
-            print("RESTART über SNES SELECT")
+        if name == "SELECT":
+            log.info("RESTART über SNES SELECT")
             self.game_running = False
-            return True
+            self.input_engine.push(SOURCE_SNES, "RESTART_SIGNAL")
+            return
 
         # 2. L/R -> DIFFICULTY
-        if "L" in pressed:
+        if name in ("L", "R"):
             levels = ["easy", "medium", "hard"]
             curr_idx = levels.index(self.current_difficulty)
-            new_idx = max(0, curr_idx - 1)
+            new_idx = max(0, curr_idx - 1) if name == "L" else min(2, curr_idx + 1)
             self.set_difficulty(levels[new_idx])
-            while "L" in self.read_pressed_snes_buttons():
-                time.sleep(0.01)  # Debounce
-
-        if "R" in pressed:
-            levels = ["easy", "medium", "hard"]
-            curr_idx = levels.index(self.current_difficulty)
-            new_idx = min(2, curr_idx + 1)
-            self.set_difficulty(levels[new_idx])
-            while "R" in self.read_pressed_snes_buttons():
-                time.sleep(0.01)  # Debounce
-
-        return False
+            return
 
-    def read_pressed_snes_buttons(self):
-        if not self.snes_enabled:
-            return []
-        bits = self.read_snes_controller()
-        pressed = []
-        for i, bit in enumerate(bits):
-            if bit == 0 and i < len(self.snes_button_names):
-                name = self.snes_button_names[i]
-                if name != "-":
-                    pressed.append(name)
-        if len(pressed) > 10:
-            return []
-        return pressed
+        # 3. Spieltasten (Farben/START), andere Tasten zählen nur zum Starten
+        self.input_engine.push(SOURCE_SNES, target if target is not None else name, timestamp=timestamp)
 
-    def process_remote_input(self, color):
+    def process_remote_input(self, color, sid=None, received_at=None):
+        """received_at: Zeitpunkt (monotonic), zu dem der Socket-Handler das Event bekam."""
         if color in self.colors or color == "START_SIGNAL":
-            print(f"HARDWARE: Signal '{color}' erhalten!")
-            with self.remote_input_lock:
-                self.remote_inputs.append(color)
+            log.info("Signal '%s' erhalten (sid=%s)", color, sid, extra={"event": "remote_input"})
+            # Prüfen und Einreihen unter demselben Lock, mit dem _run_session die Partie beendet:
+            # ein Signal landet so entweder in der laufenden Partie oder startet eine neue
+            with self._session_lock:
+                idle = self._spawn is not None and not self._session_active
+                if idle:
+                    self._session_active = True
+                else:
+                    pushed = self.input_engine.push(SOURCE_WEB, color, origin=sid, timestamp=received_at)
+            if idle:
+                # Im Leerlauf läuft kein Spiel-Thread: jedes Signal startet eine Partie (wie beim Lauflicht)
+                self._start_session()
+            elif not pushed:
+                return
+            else:
+                self._record(rec.INPUT, SOURCE_WEB, color, True, timestamp=received_at)
+            if received_at is not None:
+                self.latency.record(SOCKET_TO_INPUT, self.clock.now() - received_at)
 
             # Sofort-Feedback: LED kurz aufleuchten lassen (falls es eine Farbe ist)
             if color in self.colors:
-                threading.Thread(target=self.flash_led, args=(color,), daemon=True).start()
-
-    def _pop_remote_input(self):
-        with self.remote_input_lock:
-            return self.remote_inputs.pop(0) if self.remote_inputs else None
+                if received_at is not None and self.led_states[color] == "off":
+                    self._led_requested_at[color] = received_at
+                self.schedule_flash(color)
+
+    def _clear_inputs(self):
+        self.input_engine.clear()
+
+    def _input_poll_interval(self, remaining=None):
+        """
+        Maximale Wartezeit auf der Eingabe-Condition. Alle Quellen melden sich
+        selbst, der Timeout ist nur ein Sicherheitsnetz für verlorene Flanken.
+        """
+        interval = 0.5
+        if remaining is None:
+            return interval
+        return max(0.0, min(remaining, interval))
+
+    def _is_held(self, source, color):
+        if source == SOURCE_HARDWARE:
+            return self.debouncer.is_pressed((SOURCE_HARDWARE, color))
+        if source == SOURCE_SNES and self.snes_sampler is not None:
+            return self.snes_sampler.is_target_held(color)
+        return False
 
-    def _clear_remote_inputs(self):
-        with self.remote_input_lock:
-            self.remote_inputs.clear()
+    def _wait_for_release(self, source, color):
+        while self._is_held(source, color):
+            if self.input_engine.wait_for(source, color, False, timeout=0.1):
+                return
 
     def flash_led(self, color):
-        self._set_led_state(color, True)
-        if hasattr(self, "buzzer"):
-            try:
-                self.buzzer.on()
-            except Exception:
-                pass
-        time.sleep(self.flash_delay)
-        self._set_led_state(color, False)
-        if hasattr(self, "buzzer"):
-            try:
-                self.buzzer.off()
-            except Exception:
-                pass
-        time.sleep(self.sequence_pause)
+        """Blockierender Flash: plant an/aus und wartet Flash + Pause ab."""
+        start = self.clock.now()
+        self.schedule_flash(color, at=start)
+        self.clock.sleep_until(start + self.flash_delay + self.sequence_pause)
 
     def play_sequence(self):
+        """
+        Plant die komplette Sequenz auf feste Zeitpunkte im Aktor-Scheduler.
+        Die LEDs schalten damit im exakten Takt, auch wenn der Spiel-Thread
+        (Emits, DB) einmal länger braucht - Verzögerungen summieren sich nicht auf.
+        """
         self._emit("game_status", {"msg": "Simon zeigt..."})
-        time.sleep(0.8)
-        for color in self.sequence:
-            # Check for RESTART during Simon phase
-            if self.handle_snes_special_buttons():
+        start = self.clock.now() + SEQUENCE_START_DELAY
+        step = self.flash_delay + self.sequence_pause
+        for index, color in enumerate(self.sequence):
+            self.schedule_flash(color, at=start + index * step)
+
+        for index in range(len(self.sequence)):
+            self.clock.sleep_until(start + (index + 1) * step)
+            # Check for RESTART during Simon phase (SNES SELECT setzt game_running)
+            if not self.game_running:
+                self._cancel_sequence()
                 return
-            self.flash_led(color)
+
+    def _cancel_sequence(self):
+        """Bricht noch geplante Flashes ab und schaltet alles aus."""
+        for target in self.colors + [BUZZER]:
+            self.actuators.cancel(target)
+        for color in self.colors:
+            if self.led_states[color] == "on":
+                self._set_led_state(color, False)
+        self._set_buzzer(False)
 
     def wait_for_any_button(self):
         while True:
-            # Special SNES Buttons (SELECT/L/R)
-            if self.handle_snes_special_buttons():
+            # Hardware, Web und SNES: blockiert bis ein Callback/Web-Input eintrifft
+            event = self.input_engine.wait(timeout=self._input_poll_interval())
+            if event is None or not event.pressed:
+                continue
+
+            # Special SNES Button (SELECT)
+            if event.value == "RESTART_SIGNAL":
                 return "RESTART_SIGNAL"
 
-            # A) Hardware
-            for color, btn in self.buttons.items():
-                if btn.is_pressed:
-                    self._set_led_state(color, True)
-                    if hasattr(self, "buzzer"):
-                        try:
-                            self.buzzer.on()
-                        except Exception:
-                            pass
-                    while btn.is_pressed:
-                        time.sleep(0.01)
-                    self._set_led_state(color, False)
-                    if hasattr(self, "buzzer"):
-                        try:
-                            self.buzzer.off()
-                        except Exception:
-                            pass
-                    return color
-
-            # B) Web
-            color = self._pop_remote_input()
-            if color in self.colors:
+            if event.value not in self.colors:
+                continue
+            color = event.value
+            self._input_at = event.timestamp
+            self._input_source = event.source
+            self.latency.record(INPUT_WAIT, self.clock.now() - event.timestamp)
+            if event.source == SOURCE_HARDWARE:
+                self.actuators.cancel(color)
+                self._set_led_state(color, True)
+                self.latency.record(PRESS_TO_LED, self.clock.now() - event.timestamp)
+                self._set_buzzer(True)
+                self._wait_for_release(event.source, color)
+                self._set_led_state(color, False)
+                self._set_buzzer(False)
+            elif event.source == SOURCE_SNES:
+                self.actuators.cancel(color)
+                self._set_led_state(color, True)
+                self.latency.record(PRESS_TO_LED, self.clock.now() - event.timestamp)
+                self._wait_for_release(event.source, color)
+                self._set_led_state(color, False)
+            else:
                 self.flash_led(color)
-                return color
-
-            # C) SNES Game Buttons
-            snes_btn = self.read_pressed_snes_buttons()
-            if snes_btn:
-                for b in snes_btn:
-                    if b in SNES_MAPPING:
-                        target = SNES_MAPPING[b]
-                        self._set_led_state(target, True)
-                        while b in self.read_pressed_snes_buttons():
-                            time.sleep(0.01)
-                        self._set_led_state(target, False)
-                        return target
-            time.sleep(0.01)
+            return color
 
     def get_player_input(self):
         self._emit("game_status", {"msg": "Du bist dran!"})
-        self._clear_remote_inputs()
+        self._clear_inputs()
+        self.transcript.begin_turn(self.clock.now() - self.game_started_at)
         for expected in self.sequence:
             pressed = self.wait_for_any_button()
             if pressed == "RESTART_SIGNAL":
                 return "RESTART"
+            self.transcript.press(pressed, self._input_at - self.game_started_at, self._input_source != SOURCE_WEB)
             if pressed != expected:
                 return False
         return True
@@ -347,93 +423,205 @@ class SimonSaysGame:
     def game_over_signal(self):
         score = max(0, len(self.sequence) - 1)
         self.current_score = score
+        if self.game_started_at is not None:
+            self.game_duration_ms = int((self.clock.now() - self.game_started_at) * 1000)
         self._emit("game_over", {"score": score})
-        for _ in range(3):
+        start = self.clock.now()
+        for blink in range(GAME_OVER_BLINKS):
+            self.clock.sleep_until(start + 2 * blink * GAME_OVER_BLINK)
             for c in self.colors:
                 self._set_led_state(c, True)
-            time.sleep(0.2)
+            self.clock.sleep_until(start + (2 * blink + 1) * GAME_OVER_BLINK)
             for c in self.colors:
                 self._set_led_state(c, False)
-            time.sleep(0.2)
+        self.clock.sleep_until(start + 2 * GAME_OVER_BLINKS * GAME_OVER_BLINK)
         self.wait_for_name_input(score)
 
     def wait_for_name_input(self, score):
-        self._emit("request_name", {"score": score})
         self.name_received_flag = False
-        timer = 300
-        while not self.name_received_flag and timer > 0:
-            for btn in self.buttons.values():
-                if btn.is_pressed:
+        self._name_timed_out = False
+        self._awaiting_name = True
+        self._emit("request_name", {"score": score})
+        # Abbrechbarer Timer statt Deadline-Polling; weckt den Spiel-Thread nach Ablauf
+        timeout = self.clock.call_later(NAME_TIMEOUT, self._on_name_timeout)
+        try:
+            while not (self.name_received_flag or self._name_timed_out):
+                event = self.input_engine.wait(timeout=self._input_poll_interval())
+                if event is None or not event.pressed:
+                    continue
+                if event.source == SOURCE_HARDWARE or event.value == "RESTART_SIGNAL":
                     self.name_received_flag = True
-                    return
-            if self.handle_snes_special_buttons():
-                self.name_received_flag = True
-                return
-            time.sleep(0.1)
-            timer -= 1
+        finally:
+            timeout.cancel()
+            with self._name_lock:
+                self._awaiting_name = False
+
+    def _on_name_timeout(self):
+        self._name_timed_out = True
+        self.input_engine.interrupt()
 
     def on_name_submitted(self, name):
-        if getattr(self, "name_received_flag", False):
+        """
+        Name vom Client. Gilt nur einmal und nur während der Namensabfrage nach
+        einem Game Over; der Score wird vorher gegen Seed und Eingabeprotokoll
+        geprüft statt current_score blind zu übernehmen.
+        """
+        if not isinstance(name, str) or not name.strip():
+            return
+        with self._name_lock:
+            if not self._awaiting_name or self.name_received_flag:
+                if self._metrics:
+                    HIGHSCORES_REJECTED.inc(("window",))
+                log.warning("Name '%s' außerhalb der Namensabfrage verworfen (Station %s)", name, self.station)
+                return
+            self.name_received_flag = True
+        self.input_engine.interrupt()
+        self._record(rec.NAME, name)
+
+        if VERIFY_HIGHSCORES:
+            reason = verify(self.transcript, self.current_score, self.game_duration_ms)
+            if reason is not None:
+                if self._metrics:
+                    HIGHSCORES_REJECTED.inc((reason,))
+                log.warning(
+                    "Highscore %s für '%s' abgelehnt: Prüfung '%s' fehlgeschlagen (Station %s)",
+                    self.current_score,
+                    name,
+                    reason,
+                    self.station,
+                )
+                return
+
+        details = {
+            "difficulty": self.current_difficulty,
+            "sequence_length": len(self.sequence),
+            "duration_ms": self.game_duration_ms,
+            "station": self.station,
+        }
+        if self.highscore_writer is not None:
+            self.highscore_writer.submit(name, self.current_score, **details)
             return
-        self.name_received_flag = True
+
         from app.repository import add_highscore
 
         try:
-            add_highscore(name, self.current_score)
+            add_highscore(name, self.current_score, **details)
         except Exception:
-            pass
+            log.exception("Highscore für %s konnte nicht gespeichert werden", name)
 
     def wait_for_start_with_wave(self):
         self._emit("game_status", {"msg": "Starten?"})
         wave = self.colors + self.colors[-2:0:-1]
-        self._clear_remote_inputs()
+        self._clear_inputs()
+        step_at = self.clock.now()
         while True:
             for color in wave:
                 self._set_led_state(color, True)
-                end = time.time() + 0.15
-                while time.time() < end:
-                    if self.handle_snes_special_buttons():
-                        pass  # Update diffs
-                    for btn in self.buttons.values():
-                        if btn.is_pressed:
-                            self._set_led_state(color, False)
-                            return
-                    if self._pop_remote_input():
+                # Feste Schrittzeitpunkte: das Lauflicht driftet nicht mit der Verarbeitungszeit
+                # (nach einem Hänger wird neu ausgerichtet statt nachzuholen)
+                step_at = max(step_at + WAVE_STEP, self.clock.now())
+                while True:
+                    remaining = step_at - self.clock.now()
+                    if remaining <= 0:
+                        break
+                    event = self.input_engine.wait(timeout=self._input_poll_interval(remaining))
+                    if event is not None and event.pressed:
                         self._set_led_state(color, False)
                         return
-                    if self.read_pressed_snes_buttons():
-                        self._set_led_state(color, False)
-                        return
-                    time.sleep(0.01)
                 self._set_led_state(color, False)
 
     def start_game_loop(self):
         while True:
             self.wait_for_start_with_wave()
-            self.sequence = []
-            self.game_running = True
+            self.run_game()
+
+    def start_on_demand(self, spawn):
+        """
+        Alternative zu start_game_loop für virtuelle Boards: kein Lauflicht und
+        kein wartender Thread. Das erste Signal startet über spawn(fn) ein Spiel
+        in einem eigenen Thread/Greenlet, der nach Spielende wieder endet.
+        """
+        self._spawn = spawn
+        self._emit("game_status", {"msg": "Starten?"})
+
+    def _start_session(self):
+        """Startet den Spiel-Thread; _session_active ist vom Aufrufer schon gesetzt."""
+        self._clear_inputs()
+        self._spawn(self._run_session)
+
+    def _run_session(self):
+        try:
+            self.run_game()
+        except Exception:
+            log.exception("Spiel auf Station %s abgebrochen", self.station)
+        finally:
+            # Erst freigeben, dann "Starten?" zeigen: jedes Signal danach startet eine neue Partie
+            with self._session_lock:
+                self._session_active = False
+            self._emit("game_status", {"msg": "Starten?"})
+
+    def run_game(self, seed=None):
+        """
+        Ein komplettes Spiel ab "GO!" bis Game Over bzw. Restart.
+        Mit seed lässt sich die Farbfolge einer früheren Partie nachspielen.
+        """
+        if seed is None:
+            seed = self.rng.getrandbits(64)
+        self.sequence = PackedSequence(seed, self.colors)
+        self.transcript = Transcript(seed, self.colors)
+        self.game_running = True
+        self.game_started_at = self.clock.now()
+        if self._metrics:
+            GAMES_STARTED.inc()
+        if self.recorder is not None:
+            self._recording = True
+            # Statt jedes Schritts nur den Seed: die Folge ergibt sich aus (seed, Länge im END-Record)
+            self._record(rec.SESSION, self.current_difficulty, int(time.time()), seed, timestamp=self.game_started_at)
+        reason = "restart"
+        try:
             self._emit("game_status", {"msg": "GO!"})
-            time.sleep(0.8)
+            self.clock.sleep(GAME_START_DELAY)
             while self.game_running:
-                self.sequence.append(random.choice(self.colors))
+                round_started = self.clock.now()
+                self.sequence.extend_random()
                 self.play_sequence()
                 if not self.game_running:
+                    if self._metrics:
+                        GAMES_FINISHED.inc(("restart",))
                     break  # Restart signaled during playback
                 res = self.get_player_input()
+                if self._metrics:
+                    ROUND_SECONDS.observe(self.clock.now() - round_started)
                 if res == "RESTART":
+                    if self._metrics:
+                        GAMES_FINISHED.inc(("restart",))
                     self.game_running = False
                 elif not res:
+                    if self._metrics:
+                        GAMES_FINISHED.inc(("game_over",))
+                        SEQUENCE_LENGTH.observe(len(self.sequence))
+                    reason = "game_over"
                     self.game_over_signal()
                     self.game_running = False
                 else:
-                    time.sleep(0.4)
+                    self.clock.sleep(ROUND_PAUSE)
+        finally:
+            self._record(rec.END, max(0, len(self.sequence) - 1), reason, len(self.sequence))
+            self._recording = False
 
     def get_debug_status(self):
         return {
             "leds": self.led_states,
-            "buttons": {c: ("pressed" if b.is_pressed else "released") for c, b in self.buttons.items()},
+            # Entprellter Zustand aus den Callbacks statt erneut die Pins abzufragen
+            "buttons": {
+                c: ("pressed" if self.debouncer.is_pressed((SOURCE_HARDWARE, c)) else "released") for c in self.buttons
+            },
             "snes_enabled": self.snes_enabled,
+            "snes": self.snes_sampler.pressed_names() if self.snes_enabled else [],
+            "snes_sampler": self.snes_sampler.stats() if self.snes_enabled else None,
             "diff": self.current_difficulty,
+            "inputs": self.input_engine.stats(),
+            "debounce": self.debouncer.stats(),
         }
 
     def toggle_led_debug(self, color):
@@ -0,0 +1,122 @@
+import logging
+
+from gpiozero import LED, Button, Buzzer, Device, DigitalOutputDevice, DigitalInputDevice
+from gpiozero.exc import BadPinFactory
+from gpiozero.pins.mock import MockFactory
+
+from app.config import HARDWARE_SETUP, BUZZER_PIN, IS_RASPI, DIFFICULTY_BUTTONS, SNES_PINS
+from app.input_engine import INPUT_SOURCES, SOURCE_WEB
+
+log = logging.getLogger(__name__)
+
+# Hardware-Abstraktion für SimonSaysGame. Ein Board liefert:
+#   leds / buttons / difficulty_buttons  (dicts wie HARDWARE_SETUP/DIFFICULTY_BUTTONS)
+#   buzzer, snes (latch, clock, data) oder None
+#   virtual       -> True: keine Geräte, kein Dauer-Thread (siehe SimonSaysGame.start_on_demand)
+#   input_sources -> Quellen, für die die InputEngine einen Kanal anlegt
+
+
+# Lokaler Mock-Import, falls wir nicht auf dem Pi sind
+if not IS_RASPI:
+    log.info("Versuche mock_gpio_gui zu laden...")
+    try:
+        from mock_gpio_gui import LED, Button, Buzzer, Device, DigitalOutputDevice, DigitalInputDevice
+
+        log.info("GUI-Emulator geladen.")
+    except ImportError as e:
+        log.warning("Fehler beim Laden von mock_gpio_gui: %s", e)
+        try:
+            Device.pin_factory = MockFactory()
+        except Exception:
+            pass
+
+
+class SilentBuzzer:
+    def on(self):
+        pass
+
+    def off(self):
+        pass
+
+
+def ensure_gpio_factory():
+    """Nutzt echte GPIOs auf dem Pi, sonst Mock für lokale/dev Umgebungen."""
+    try:
+        Device.ensure_pin_factory()
+    except BadPinFactory:
+        Device.pin_factory = MockFactory()
+    except Exception:
+        # Bei alternativen Mock-Devices (z.B. GUI) kann ensure_pin_factory fehlen.
+        try:
+            Device.pin_factory = MockFactory()
+        except Exception:
+            pass
+
+
+class GpioBoard:
+    """Die echten Taster/LEDs am Pi (bzw. der Tk-Emulator/MockFactory am PC)."""
+
+    virtual = False
+    input_sources = INPUT_SOURCES
+
+    def __init__(self):
+        ensure_gpio_factory()
+        self.leds = {}
+        self.buttons = {}
+        for color, pins in HARDWARE_SETUP.items():
+            self.leds[color] = LED(pins["led"])
+            self.buttons[color] = Button(pins["btn"], pull_up=True)
+
+        self.difficulty_buttons = {}
+        for level, pin in DIFFICULTY_BUTTONS.items():
+            try:
+                self.difficulty_buttons[level] = Button(pin, pull_up=True)
+            except Exception:
+                pass
+
+        try:
+            self.buzzer = Buzzer(BUZZER_PIN)
+        except Exception:
+            self.buzzer = SilentBuzzer()
+
+        # SNES-Schieberegister nur auf dem Pi
+        self.snes = None
+        if IS_RASPI:
+            try:
+                self.snes = (
+                    DigitalOutputDevice(SNES_PINS["LATCH"]),
+                    DigitalOutputDevice(SNES_PINS["CLOCK"]),
+                    DigitalInputDevice(SNES_PINS["DATA"], pull_up=True),
+                )
+            except Exception:
+                self.snes = None
+
+    @property
+    def mode(self):
+        return "PI" if IS_RASPI else "MOCK"
+
+
+# Ein gemeinsames Objekt für alle virtuellen Ausgänge: schalten kostet nichts,
+# der Zustand steht ohnehin in SimonSaysGame.led_states und geht als Event raus
+NULL_OUTPUT = SilentBuzzer()
+
+
+class VirtualBoard:
+    """
+    Reines Web-Board ohne GPIO und ohne Tk.
+
+    Eingaben kommen nur über die Input-Queue (process_remote_input), Ausgaben
+    sind nur die led_state-Events des Spiels. Es gibt keine Geräte-Objekte,
+    keine Pin-Factory und keine Threads.
+    """
+
+    virtual = True
+    input_sources = (SOURCE_WEB,)
+    mode = "VIRTUELL"
+
+    def __init__(self):
+        self.leds = dict.fromkeys(HARDWARE_SETUP, NULL_OUTPUT)
+        self.buttons = {}
+        self.difficulty_buttons = {}
+        self.buzzer = NULL_OUTPUT
+        self.snes = None
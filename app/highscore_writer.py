@@ -0,0 +1,93 @@
+import atexit
+import logging
+import queue
+import sqlite3
+import threading
+import time
+
+from app.config import HIGHSCORE_BATCH_SIZE, HIGHSCORE_FLUSH_INTERVAL, HIGHSCORE_MAX_RETRIES
+from app.repository import insert_highscores, make_highscore
+
+log = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class HighscoreWriter:
+    """
+    Write-Behind für Highscores.
+
+    submit() legt den Eintrag nur in eine Queue. Ein Worker-Thread sammelt
+    Einträge bis zur Batch-Größe oder bis das Flush-Intervall abläuft und
+    schreibt sie in einer Transaktion. Bei "database is locked" wird mit
+    Backoff wiederholt; beim Beenden wird die Queue vollständig geleert.
+    """
+
+    def __init__(
+        self,
+        pool,
+        batch_size=HIGHSCORE_BATCH_SIZE,
+        flush_interval=HIGHSCORE_FLUSH_INTERVAL,
+        max_retries=HIGHSCORE_MAX_RETRIES,
+    ):
+        self._pool = pool
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self._queue = queue.Queue()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="highscore-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def submit(self, name, score, **extra):
+        """Nicht-blockierend; gibt den vorbereiteten Eintrag zurück."""
+        entry = make_highscore(name, score, **extra)
+        self._queue.put(entry)
+        return entry
+
+    def close(self, timeout=5.0):
+        """Schreibt alle ausstehenden Einträge und beendet den Worker."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            if first is _STOP:
+                break
+            batch = [first]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._flush(batch)
+
+    def _flush(self, batch):
+        for attempt in range(self.max_retries + 1):
+            try:
+                with self._pool.connection() as db:
+                    insert_highscores(db, batch)
+                return
+            except sqlite3.OperationalError as exc:
+                message = str(exc).lower()
+                if ("locked" not in message and "busy" not in message) or attempt == self.max_retries:
+                    log.error("Highscores verloren (%s): %s", exc, [e['name'] for e in batch])
+                    return
+                delay = 0.05 * (2**attempt)
+                log.warning("DB gesperrt, neuer Versuch in %.2fs (%d/%d)", delay, attempt + 1, self.max_retries)
+                time.sleep(delay)
+            except Exception:
+                log.exception("Highscores konnten nicht gespeichert werden: %s", [e['name'] for e in batch])
+                return
@@ -0,0 +1,205 @@
+import threading
+from collections import deque, namedtuple
+
+from app.config import INPUT_QUEUE_SIZE, INPUT_OVERFLOW_POLICY
+from app.metrics import INPUT_EVENTS
+from app.clock import system_clock
+
+# Quellen, aus denen Eingaben in die Engine gelangen
+SOURCE_HARDWARE = "hardware"
+SOURCE_WEB = "web"
+SOURCE_SNES = "snes"
+INPUT_SOURCES = (SOURCE_HARDWARE, SOURCE_WEB, SOURCE_SNES)
+
+# Überlauf-Strategien für volle Kanäle
+DROP_OLDEST = "drop_oldest"
+DROP_NEWEST = "drop_newest"
+COALESCE = "coalesce"
+OVERFLOW_POLICIES = (DROP_OLDEST, DROP_NEWEST, COALESCE)
+
+# origin: Socket.IO-SID bei Web-Eingaben, sonst None
+InputEvent = namedtuple("InputEvent", ["source", "value", "pressed", "timestamp", "origin"])
+
+
+class InputChannel:
+    """
+    Begrenzter FIFO-Puffer für Eingaben einer Quelle.
+
+    Speicher und Zugriffszeit bleiben auch bei Flut konstant; was beim
+    Überlauf passiert, bestimmt die Policy:
+      drop_oldest - ältesten Eintrag verwerfen
+      drop_newest - neuen Eintrag verwerfen
+      coalesce    - Duplikat des letzten Eintrags verschlucken, sonst drop_oldest
+    """
+
+    def __init__(self, capacity=INPUT_QUEUE_SIZE, policy=INPUT_OVERFLOW_POLICY):
+        if policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unbekannte Overflow-Policy: {policy}")
+        self.capacity = capacity
+        self.policy = policy
+        self._items = deque()
+        self.dropped_oldest = 0
+        self.dropped_newest = 0
+        self.coalesced = 0
+
+    def __len__(self):
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def put(self, event):
+        """Reiht ein Ereignis ein. Gibt False zurück, wenn es verworfen wurde."""
+        items = self._items
+        if len(items) < self.capacity:
+            items.append(event)
+            return True
+
+        if self.policy == DROP_NEWEST:
+            self.dropped_newest += 1
+            return False
+
+        if self.policy == COALESCE:
+            last = items[-1]
+            if (last.source, last.value, last.pressed, last.origin) == (
+                event.source,
+                event.value,
+                event.pressed,
+                event.origin,
+            ):
+                self.coalesced += 1
+                return False
+
+        items.popleft()
+        self.dropped_oldest += 1
+        items.append(event)
+        return True
+
+    def peek(self):
+        return self._items[0] if self._items else None
+
+    def popleft(self):
+        return self._items.popleft()
+
+    def remove(self, event):
+        self._items.remove(event)
+
+    def clear(self):
+        self._items.clear()
+
+    def stats(self):
+        return {
+            "depth": len(self._items),
+            "capacity": self.capacity,
+            "policy": self.policy,
+            "dropped_oldest": self.dropped_oldest,
+            "dropped_newest": self.dropped_newest,
+            "coalesced": self.coalesced,
+        }
+
+
+class InputEngine:
+    """
+    Zentrale, ereignisgesteuerte Eingabe für das Spiel.
+
+    Hardware-Taster liefern ihre Flanken über gpiozero-Callbacks, Web-Eingaben
+    werden direkt eingereiht. Jede Quelle hat einen eigenen begrenzten Kanal,
+    damit eine Flut aus dem Browser keine Hardware-Eingaben verdrängt.
+    Der Spiel-Thread blockiert auf einer einzigen Condition statt zu pollen.
+    """
+
+    def __init__(
+        self, capacity=INPUT_QUEUE_SIZE, policy=INPUT_OVERFLOW_POLICY, clock=system_clock, sources=INPUT_SOURCES
+    ):
+        # Zeitstempel und Wartezeiten laufen über die Uhr (VirtualClock in der Simulation)
+        self.clock = clock
+        # Eingaben auf virtueller Zeit (Simulation, Replay) zählen nicht in /metrics
+        self._count_events = not clock.virtual
+        self._cond = threading.Condition()
+        # Nur Kanäle für Quellen, die es am Board gibt (ein Web-Board braucht nur "web")
+        self._channels = {source: InputChannel(capacity, policy) for source in sources}
+        self._interrupts = 0
+
+    def push(self, source, value, pressed=True, origin=None, timestamp=None):
+        # timestamp: Zeitpunkt der Flanke, falls sie vorgefiltert wurde (Entprellung)
+        event = InputEvent(source, value, pressed, self.clock.now() if timestamp is None else timestamp, origin)
+        if self._count_events:
+            INPUT_EVENTS.inc((source,))
+        with self._cond:
+            accepted = self._channels[source].put(event)
+            if accepted:
+                self._cond.notify_all()
+        return accepted
+
+    def interrupt(self):
+        """Weckt wartende Threads, ohne ein Ereignis einzureihen."""
+        with self._cond:
+            self._interrupts += 1
+            self._cond.notify_all()
+
+    def _pop_oldest(self):
+        # Über alle Kanäle hinweg das älteste Ereignis (max. drei Köpfe vergleichen)
+        oldest = None
+        for channel in self._channels.values():
+            head = channel.peek()
+            if head is not None and (oldest is None or head.timestamp < oldest[1].timestamp):
+                oldest = (channel, head)
+        if oldest is None:
+            return None
+        return oldest[0].popleft()
+
+    def wait(self, timeout=None):
+        """
+        Wartet auf das nächste Ereignis (quellenübergreifend in Ankunftsreihenfolge).
+        Gibt None zurück, wenn der Timeout abläuft oder interrupt() aufgerufen wurde.
+        """
+        deadline = None if timeout is None else self.clock.now() + timeout
+        with self._cond:
+            seen = self._interrupts
+            while True:
+                event = self._pop_oldest()
+                if event is not None:
+                    return event
+                if self._interrupts != seen:
+                    return None
+                if deadline is None:
+                    self.clock.wait(self._cond)
+                    continue
+                remaining = deadline - self.clock.now()
+                if remaining <= 0:
+                    return None
+                self.clock.wait(self._cond, remaining)
+
+    def wait_for(self, source, value, pressed, timeout=None):
+        """
+        Wartet gezielt auf ein passendes Ereignis und entfernt nur dieses.
+        Andere Ereignisse bleiben in der Reihenfolge erhalten.
+        """
+        deadline = None if timeout is None else self.clock.now() + timeout
+        with self._cond:
+            channel = self._channels[source]
+            while True:
+                for event in channel:
+                    if event.value == value and event.pressed == pressed:
+                        channel.remove(event)
+                        return event
+                if deadline is None:
+                    self.clock.wait(self._cond)
+                    continue
+                remaining = deadline - self.clock.now()
+                if remaining <= 0:
+                    return None
+                self.clock.wait(self._cond, remaining)
+
+    def clear(self):
+        with self._cond:
+            for channel in self._channels.values():
+                channel.clear()
+
+    def stats(self):
+        with self._cond:
+            return {source: channel.stats() for source, channel in self._channels.items()}
+
+    def peek_stats(self):
+        """Wie stats(), aber ohne Lock - für Monitoring, das den Spiel-Thread nie aufhalten darf."""
+        return {source: channel.stats() for source, channel in self._channels.items()}
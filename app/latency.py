@@ -0,0 +1,112 @@
+import time
+
+# Messpfade (Quelle -> Ziel)
+PRESS_TO_LED = "press_to_led"  # GPIO-/SNES-Flanke bzw. Socket-Empfang -> LED an
+INPUT_WAIT = "input_wait"  # Eingang -> Spiel-Thread hat das Ereignis abgeholt
+SOCKET_TO_INPUT = "socket_to_input"  # Socket.IO-Empfang -> Eingabe eingereiht
+EMIT_QUEUE = "emit_queue"  # Event veröffentlicht -> Versand beginnt
+EMIT_SEND = "emit_send"  # Dauer des eigentlichen socketio.emit
+
+LATENCY_PATHS = [PRESS_TO_LED, INPUT_WAIT, SOCKET_TO_INPUT, EMIT_QUEUE, EMIT_SEND]
+
+# Pro Zweierpotenz 16 Unter-Buckets -> max. ~6 % relativer Fehler
+SUB_BUCKET_BITS = 4
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+# Bis 2^27 µs (~2 Minuten), alles darüber landet im letzten Bucket
+MAX_EXPONENT = 27
+BUCKET_COUNT = SUB_BUCKETS * (MAX_EXPONENT - SUB_BUCKET_BITS + 1)
+
+
+def _bucket_index(micros):
+    if micros < 2 * SUB_BUCKETS:
+        return micros
+    shift = micros.bit_length() - SUB_BUCKET_BITS - 1
+    index = SUB_BUCKETS * shift + (micros >> shift)
+    return min(index, BUCKET_COUNT - 1)
+
+
+def _bucket_upper(index):
+    """Größter Wert (µs), der in diesem Bucket landet."""
+    if index < 2 * SUB_BUCKETS:
+        return index
+    shift = index // SUB_BUCKETS - 1
+    return ((index - SUB_BUCKETS * shift + 1) << shift) - 1
+
+
+class LatencyHistogram:
+    """
+    Histogramm mit logarithmisch-linearen Buckets (HDR-Prinzip) in µs.
+
+    record() ist ein einzelnes Listen-Inkrement ohne Lock; im Hot-Path darf
+    nichts blockieren. Unter gleichzeitigen Schreibern kann im Extremfall
+    eine Zählung verloren gehen - für Perzentile ist das unerheblich.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self._counts = [0] * BUCKET_COUNT
+        self.count = 0
+        self.total_us = 0
+        self.max_us = 0
+
+    def record(self, seconds):
+        micros = int(seconds * 1e6)
+        if micros < 0:
+            micros = 0
+        self._counts[_bucket_index(micros)] += 1
+        self.count += 1
+        self.total_us += micros
+        if micros > self.max_us:
+            self.max_us = micros
+
+    def percentile(self, q):
+        counts = list(self._counts)
+        total = sum(counts)
+        if not total:
+            return 0
+        target = max(1, int(total * q / 100.0 + 0.5))
+        seen = 0
+        for index, n in enumerate(counts):
+            seen += n
+            if seen >= target:
+                return min(_bucket_upper(index), self.max_us)
+        return self.max_us
+
+    def summary(self):
+        """Kennzahlen in Millisekunden."""
+        count = self.count
+        return {
+            "count": count,
+            "mean_ms": round(self.total_us / count / 1000.0, 3) if count else 0.0,
+            "p50_ms": self.percentile(50) / 1000.0,
+            "p95_ms": self.percentile(95) / 1000.0,
+            "p99_ms": self.percentile(99) / 1000.0,
+            "max_ms": self.max_us / 1000.0,
+        }
+
+
+class LatencyTracker:
+    """Ein Histogramm pro Messpfad; Zeitstempel sind immer time.monotonic()."""
+
+    def __init__(self, paths=LATENCY_PATHS):
+        self.histograms = {path: LatencyHistogram() for path in paths}
+
+    def record(self, path, seconds):
+        self.histograms[path].record(seconds)
+
+    def since(self, path, started):
+        """Misst von `started` (monotonic) bis jetzt."""
+        self.histograms[path].record(time.monotonic() - started)
+
+    def reset(self):
+        for histogram in self.histograms.values():
+            histogram.reset()
+
+    def summary(self):
+        return {path: histogram.summary() for path, histogram in self.histograms.items()}
+
+
+# Prozessweit, damit Broadcaster, Socket-Handler und Spiel-Thread denselben nutzen
+latency = LatencyTracker()
@@ -0,0 +1,81 @@
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+
+_listener = None
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Lässt pro Event-Typ nur jedes n-te Record durch.
+    Der Typ kommt über extra={"event": "..."}; Records ohne Typ passieren immer.
+    """
+
+    def __init__(self, rates):
+        super().__init__()
+        self.rates = dict(rates)
+        self._counters = {}
+
+    def filter(self, record):
+        event = getattr(record, "event", None)
+        rate = self.rates.get(event, 1) if event else 1
+        if rate <= 1:
+            return True
+        count = self._counters.get(event, 0)
+        self._counters[event] = count + 1
+        if count % rate:
+            return False
+        record.sample_rate = rate
+        return True
+
+
+class _RecordQueueHandler(logging.handlers.QueueHandler):
+    # Formatierung passiert erst im Listener-Thread, nicht auf dem Spiel-Thread
+    def prepare(self, record):
+        return record
+
+
+def configure_logging(config):
+    """
+    Richtet das "app"-Logging ein: der aufrufende Thread legt Records nur in
+    eine Queue, ein Listener-Thread schreibt sie in eine rotierende Datei
+    (und ab LOG_CONSOLE_LEVEL zusätzlich auf stdout).
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    formatter = logging.Formatter("%(asctime)s %(levelname)s [%(threadName)s] %(name)s: %(message)s")
+    handlers = []
+
+    log_file = config.get("LOG_FILE")
+    if log_file:
+        os.makedirs(os.path.dirname(log_file), exist_ok=True)
+        file_handler = logging.handlers.RotatingFileHandler(
+            log_file,
+            maxBytes=config.get("LOG_MAX_BYTES", 1024 * 1024),
+            backupCount=config.get("LOG_BACKUP_COUNT", 3),
+            encoding="utf-8",
+        )
+        file_handler.setFormatter(formatter)
+        handlers.append(file_handler)
+
+    console_handler = logging.StreamHandler()
+    console_handler.setLevel(config.get("LOG_CONSOLE_LEVEL", "WARNING"))
+    console_handler.setFormatter(formatter)
+    handlers.append(console_handler)
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = _RecordQueueHandler(log_queue)
+    queue_handler.addFilter(SamplingFilter(config.get("LOG_SAMPLING", {})))
+
+    logger = logging.getLogger("app")
+    logger.setLevel(config.get("LOG_LEVEL", "INFO"))
+    logger.addHandler(queue_handler)
+    logger.propagate = False
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
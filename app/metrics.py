@@ -0,0 +1,253 @@
+import bisect
+import time
+
+# Prometheus-Textformat ohne zusätzliche Abhängigkeit. Alle Schreibzugriffe sind
+# einzelne Dict-/Listen-Operationen ohne Lock; der Scrape kopiert nur Werte und
+# blockiert damit nie den Spiel-Thread. Unter gleichzeitigen Schreibern kann im
+# Extremfall ein Inkrement verloren gehen - für Monitoring ist das unerheblich.
+
+
+def _format_labels(names, values):
+    if not names:
+        return ""
+    pairs = []
+    for name, value in zip(names, values):
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{name}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+
+    def _samples(self):
+        raise NotImplementedError
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for suffix, names, values, value in self._samples():
+            lines.append(f"{self.name}{suffix}{_format_labels(names, values)} {_format_value(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    """Monoton steigender Zähler; Labelwerte werden als Tupel übergeben."""
+
+    kind = "counter"
+
+    def __init__(self, name, help_text, labels=()):
+        super().__init__(name, help_text, labels)
+        self._values = {}
+
+    def inc(self, labels=(), amount=1):
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, labels=()):
+        return self._values.get(labels, 0)
+
+    def _samples(self):
+        for labels, value in list(self._values.items()):
+            yield "", self.labels, labels, value
+
+
+class Gauge(Counter):
+    """Momentanwert; alternativ liefert eine Funktion die Werte erst beim Scrape."""
+
+    kind = "gauge"
+
+    def __init__(self, name, help_text, labels=()):
+        super().__init__(name, help_text, labels)
+        self._collect = None
+
+    def set(self, value, labels=()):
+        self._values[labels] = value
+
+    def dec(self, labels=(), amount=1):
+        self.inc(labels, -amount)
+
+    def set_function(self, collect):
+        """collect() -> {labeltupel: wert}; wird nur beim Scrape aufgerufen."""
+        self._collect = collect
+
+    def _samples(self):
+        if self._collect is not None:
+            for labels, value in self._collect().items():
+                yield "", self.labels, labels, value
+        yield from super()._samples()
+
+
+class CounterFunction(Gauge):
+    """Zähler, dessen Werte an anderer Stelle ohnehin mitgezählt werden (nur beim Scrape gelesen)."""
+
+    kind = "counter"
+
+
+class Histogram(_Metric):
+    """Verteilung mit festen Bucket-Grenzen (kumulativ ausgegeben wie bei Prometheus)."""
+
+    kind = "histogram"
+
+    def __init__(self, name, help_text, buckets, labels=()):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+
+    def _series_for(self, labels):
+        series = self._series.get(labels)
+        if series is None:
+            # [Zähler je Bucket (+Inf am Ende), Summe, Anzahl]
+            series = self._series.setdefault(labels, [[0] * (len(self.buckets) + 1), 0.0, 0])
+        return series
+
+    def observe(self, value, labels=()):
+        series = self._series_for(labels)
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def time(self, labels=()):
+        return _Timer(self, labels)
+
+    def _samples(self):
+        bucket_names = self.labels + ("le",)
+        for labels, (counts, total, count) in list(self._series.items()):
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), list(counts)):
+                cumulative += n
+                yield "_bucket", bucket_names, labels + (_format_value(float(bound)),), cumulative
+            yield "_sum", self.labels, labels, total
+            yield "_count", self.labels, labels, count
+
+
+class _Timer:
+    """with histogram.time(): ... misst die Dauer in Sekunden."""
+
+    __slots__ = ("_histogram", "_labels", "_started")
+
+    def __init__(self, histogram, labels):
+        self._histogram = histogram
+        self._labels = labels
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._histogram.observe(time.perf_counter() - self._started, self._labels)
+        return False
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+GAMES_STARTED = registry.register(Counter("simon_games_started_total", "Gestartete Spiele"))
+GAMES_FINISHED = registry.register(
+    Counter("simon_games_finished_total", "Beendete Spiele nach Grund", labels=("reason",))
+)
+SEQUENCE_LENGTH = registry.register(
+    Histogram(
+        "simon_sequence_length",
+        "Länge der Sequenz bei Spielende",
+        buckets=(1, 2, 3, 5, 8, 10, 15, 20, 30, 50),
+    )
+)
+ROUND_SECONDS = registry.register(
+    Histogram(
+        "simon_game_loop_iteration_seconds",
+        "Dauer einer Runde der Spielschleife (Sequenz zeigen + Eingabe)",
+        buckets=(0.5, 1, 2, 5, 10, 20, 30, 60, 120),
+    )
+)
+INPUT_EVENTS = registry.register(
+    Counter("simon_input_events_total", "Eingaben pro Quelle (inkl. Loslassen)", labels=("source",))
+)
+INPUT_QUEUE_DEPTH = registry.register(
+    Gauge("simon_input_queue_depth", "Aktuelle Tiefe des Eingabe-Kanals", labels=("station", "source"))
+)
+INPUT_DROPPED = registry.register(
+    CounterFunction(
+        "simon_input_dropped_total", "Verworfene Eingaben beim Überlauf", labels=("station", "source", "reason")
+    )
+)
+HIGHSCORES_REJECTED = registry.register(
+    Counter("simon_highscores_rejected_total", "Abgelehnte Highscore-Einsendungen nach Grund", labels=("reason",))
+)
+SOCKET_EMITS = registry.register(
+    Counter("simon_socketio_emits_total", "Socket.IO-Emits pro Event und Namespace", labels=("event", "namespace"))
+)
+SOCKET_CLIENTS = registry.register(
+    Gauge("simon_socketio_clients", "Verbundene Clients pro Namespace", labels=("namespace",))
+)
+SESSION_LOG_DROPPED = registry.register(
+    Counter("simon_session_log_dropped_total", "Verworfene Records, weil das Session-Log nicht schreibbar ist")
+)
+DB_QUERY_SECONDS = registry.register(
+    Histogram(
+        "simon_db_query_seconds",
+        "Dauer von Lese-Abfragen",
+        buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1),
+        labels=("query",),
+    )
+)
+DB_COMMIT_SECONDS = registry.register(
+    Histogram(
+        "simon_db_commit_seconds",
+        "Dauer von Schreib-Transaktionen (BEGIN bis COMMIT)",
+        buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1),
+    )
+)
+
+
+# Station -> InputEngine; gelesen wird erst beim Scrape
+_input_engines = {}
+
+
+def _input_queue_depth():
+    values = {}
+    for station, engine in list(_input_engines.items()):
+        for source, stats in engine.peek_stats().items():
+            values[(station, source)] = stats["depth"]
+    return values
+
+
+def _input_dropped():
+    values = {}
+    for station, engine in list(_input_engines.items()):
+        for source, stats in engine.peek_stats().items():
+            for reason in ("dropped_oldest", "dropped_newest", "coalesced"):
+                values[(station, source, reason)] = stats[reason]
+    return values
+
+
+def watch_input_engine(engine, station="main"):
+    """Warteschlangen-Tiefe und Drops werden erst beim Scrape aus den Kanälen gelesen."""
+    _input_engines[station] = engine
+    INPUT_QUEUE_DEPTH.set_function(_input_queue_depth)
+    INPUT_DROPPED.set_function(_input_dropped)
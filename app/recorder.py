@@ -0,0 +1,562 @@
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from collections import namedtuple
+
+from app.config import (
+    DIFFICULTY_SETTINGS,
+    HARDWARE_SETUP,
+    SNES_MAPPING,
+    SESSION_LOG_BACKUP_COUNT,
+    SESSION_LOG_FLUSH_INTERVAL,
+    SESSION_LOG_INDEX_EVERY,
+    SESSION_LOG_MAX_BYTES,
+)
+from app.input_engine import INPUT_SOURCES, SOURCE_HARDWARE, SOURCE_SNES, SOURCE_WEB
+from app.metrics import SESSION_LOG_DROPPED
+from app.sequence import PackedSequence
+from app.snes import SNES_BUTTON_NAMES
+
+log = logging.getLogger(__name__)
+
+# Binärformat (append-only):
+#
+#   Header:  MAGIC, Anzahl Symbole (varint), Symbole als Strings
+#   Record:  Typ (1 Byte), Länge (varint), Nutzdaten
+#   Nutzdaten normaler Records: Kanal (varint), Zeit-Delta in µs (zigzag-varint),
+#   danach die Felder des Typs. Jeder Index-Block setzt die Zeitbasis absolut,
+#   danach werden die Kanäle (Station -> Nummer) erneut deklariert. Ein Leser
+#   kann so an jedem Index-Block einsteigen; unbekannte Typen überspringt er.
+#
+# Strings und Farben/Quellen werden über die Symboltabelle als kleine Zahlen
+# geschrieben (0 = String folgt inline).
+#
+# Die Farbfolge selbst steht nicht im Log: SESSION trägt den Seed, END die
+# Länge, daraus erzeugt PackedSequence.regenerate die Folge neu.
+
+MAGIC = b"SIMONREC\x01"
+
+CHANNEL = 1  # Station (String)
+SESSION = 2  # Schwierigkeit (Symbol), Wanduhrzeit (s), Seed der Farbfolge
+INPUT = 3  # Quelle << 1 | gedrückt, Wert (Symbol)
+LED = 4  # Farbe (Symbol) << 1 | an
+DIFFICULTY = 5  # Stufe (Symbol)
+NAME = 6  # Name (String)
+END = 7  # Score, Grund (Symbol), Länge der Farbfolge
+INDEX = 8  # absolute Zeit (µs), Offset des vorigen Index-Blocks (beim ersten: eigener), Wanduhrzeit (µs)
+
+SYMBOLS = tuple(
+    dict.fromkeys(
+        list(HARDWARE_SETUP)
+        + ["START_SIGNAL", "RESTART_SIGNAL", "game_over", "restart"]
+        + list(DIFFICULTY_SETTINGS)
+        + [name for name in SNES_BUTTON_NAMES if name != "-"]
+    )
+)
+
+_STOP = object()
+
+
+# --- Kodierung ---
+
+
+def _put_varint(buf, value):
+    while value >= 0x80:
+        buf.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buf.append(value)
+
+
+def _zigzag(value):
+    return value << 1 if value >= 0 else ((-value) << 1) - 1
+
+
+def _unzigzag(value):
+    return value >> 1 if not value & 1 else -((value + 1) >> 1)
+
+
+def _put_string(buf, text):
+    data = text.encode("utf-8")
+    _put_varint(buf, len(data))
+    buf += data
+
+
+class _Reader:
+    __slots__ = ("data", "pos")
+
+    def __init__(self, data, pos=0):
+        self.data = data
+        self.pos = pos
+
+    def varint(self):
+        value = shift = 0
+        while True:
+            byte = self.data[self.pos]
+            self.pos += 1
+            value |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                return value
+            shift += 7
+
+    def string(self):
+        length = self.varint()
+        text = bytes(self.data[self.pos : self.pos + length]).decode("utf-8")
+        self.pos += length
+        return text
+
+
+def _micros(timestamp):
+    return int(round(timestamp * 1_000_000))
+
+
+# --- Schreiben ---
+
+
+class SessionLog:
+    """
+    Append-only Binärlog für Spielaufzeichnungen.
+
+    Der aufrufende Thread legt nur ein Tupel in eine Queue; kodiert und
+    geschrieben wird in einem gemeinsamen Writer-Thread (gestartet beim ersten
+    Record), gepuffert und spätestens nach flush_interval auf die Platte.
+    """
+
+    def __init__(
+        self,
+        path,
+        flush_interval=SESSION_LOG_FLUSH_INTERVAL,
+        index_every=SESSION_LOG_INDEX_EVERY,
+        max_bytes=SESSION_LOG_MAX_BYTES,
+        backup_count=SESSION_LOG_BACKUP_COUNT,
+    ):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.index_every = index_every
+        # Wie RotatingFileHandler: path -> path.1 -> ... -> path.<backup_count>; 0 = nie rotieren
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self._queue = queue.SimpleQueue()
+        self._channels = []
+        self._lock = threading.Lock()
+        self._thread = None
+        # Nach einem Schreibfehler (Platte voll, Pfad nicht schreibbar) wird nur noch verworfen
+        self.failed = False
+        self._symbols = {symbol: index + 1 for index, symbol in enumerate(SYMBOLS)}
+        self.records = 0
+
+    def channel(self, station):
+        """Liefert den Recorder für eine Station (ein Kanal pro Station)."""
+        with self._lock:
+            number = len(self._channels)
+            self._channels.append(station or "")
+        self._put((number, CHANNEL, None, (station or "",)))
+        return SessionRecorder(self, number)
+
+    def _put(self, item):
+        if self.failed:
+            SESSION_LOG_DROPPED.inc()
+            return
+        self._queue.put(item)
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="session-log", daemon=True)
+                    self._thread.start()
+                    atexit.register(self.close)
+
+    def close(self, timeout=5.0):
+        """Schreibt alles Ausstehende und beendet den Writer."""
+        thread = self._thread
+        if thread is None or not thread.is_alive():
+            return
+        self._queue.put(_STOP)
+        thread.join(timeout)
+
+    def _run(self):
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._write_loop()
+        except Exception as exc:
+            log.error("Session-Log %s nicht schreibbar, Aufzeichnung abgeschaltet: %s", self.path, exc)
+            self._fail()
+
+    def _fail(self):
+        """Writer ist tot: ab jetzt verwerfen statt die Queue endlos wachsen zu lassen."""
+        with self._lock:
+            self.failed = True
+            self._thread = None
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if item is not _STOP:
+                SESSION_LOG_DROPPED.inc()
+
+    def _header_matches(self):
+        """
+        Passt der Header einer vorhandenen Datei zu dieser Version? Die Records
+        verweisen auf die Symboltabelle im Header; ändert sie sich (z.B. andere
+        Farben in der Config), darf nicht mehr an die alte Datei angehängt werden.
+        """
+        try:
+            with open(self.path, "rb") as f:
+                data = f.read(len(MAGIC) + 64 * 1024)
+        except FileNotFoundError:
+            return True
+        if not data:
+            return True
+        if not data.startswith(MAGIC):
+            return False
+        reader = _Reader(data, len(MAGIC))
+        try:
+            return tuple(reader.string() for _ in range(reader.varint())) == SYMBOLS
+        except (IndexError, UnicodeDecodeError):
+            return False
+
+    def _open(self):
+        """Öffnet die Log-Datei zum Anhängen; eine neue Datei bekommt den Header."""
+        if not self._header_matches():
+            log.warning("Session-Log %s hat eine andere Symboltabelle, beginne neue Datei", self.path)
+            self._rotate()
+        f = open(self.path, "ab")
+        if f.tell() == 0:
+            header = bytearray(MAGIC)
+            _put_varint(header, len(SYMBOLS))
+            for symbol in SYMBOLS:
+                _put_string(header, symbol)
+            f.write(header)
+        return f
+
+    def _rotate(self):
+        for number in range(self.backup_count - 1, 0, -1):
+            source = f"{self.path}.{number}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{number + 1}")
+        if self.backup_count > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+
+    def _write_loop(self):
+        f = self._open()
+        buf = bytearray()
+        state = {"base": None, "index_at": None, "since_index": 0, "channels": {}}
+        try:
+            while True:
+                try:
+                    item = self._queue.get(timeout=self.flush_interval if buf else None)
+                except queue.Empty:
+                    f.write(buf)
+                    f.flush()
+                    buf.clear()
+                    continue
+                if item is _STOP:
+                    break
+                if item[1] == SESSION and self.max_bytes and f.tell() + len(buf) >= self.max_bytes:
+                    # Nur am Anfang einer Partie rotieren, damit sie ganz in einer Datei steht.
+                    # Die neue Datei beginnt mit einem Index-Block, der die Kanäle neu deklariert.
+                    f.write(buf)
+                    buf.clear()
+                    f.close()
+                    self._rotate()
+                    f = self._open()
+                    state.update(base=None, index_at=None, since_index=0)
+                self._encode_item(buf, f, item, state)
+                if len(buf) >= 4096:
+                    f.write(buf)
+                    buf.clear()
+            f.write(buf)
+        finally:
+            f.close()
+
+    def _encode_item(self, buf, f, item, state):
+        channel, kind, timestamp, fields = item
+        if kind == CHANNEL:
+            state["channels"][channel] = fields[0]
+            # Vor dem ersten Index-Block wird der Kanal mit diesem deklariert
+            if state["base"] is not None:
+                self._write_record(buf, CHANNEL, channel, 0, self._encode_fields(CHANNEL, fields))
+            return
+        if state["base"] is None or state["since_index"] >= self.index_every:
+            self._write_index(buf, f.tell() + len(buf), timestamp, state)
+        stamp = _micros(timestamp)
+        self._write_record(buf, kind, channel, stamp - state["base"], self._encode_fields(kind, fields))
+        state["base"] = stamp
+        state["since_index"] += 1
+        self.records += 1
+
+    def _write_index(self, buf, offset, timestamp, state):
+        stamp = _micros(timestamp)
+        body = bytearray()
+        _put_varint(body, stamp)
+        _put_varint(body, state["index_at"] if state["index_at"] is not None else offset)
+        _put_varint(body, _micros(time.time()))
+        buf.append(INDEX)
+        _put_varint(buf, len(body))
+        buf += body
+        state["base"] = stamp
+        state["index_at"] = offset
+        state["since_index"] = 0
+        # Kanäle nach jedem Index neu deklarieren, damit Leser hier einsteigen können
+        for number, station in state["channels"].items():
+            self._write_record(buf, CHANNEL, number, 0, self._encode_fields(CHANNEL, (station,)))
+
+    def _write_record(self, buf, kind, channel, delta, payload):
+        body = bytearray()
+        _put_varint(body, channel)
+        _put_varint(body, _zigzag(delta))
+        body += payload
+        buf.append(kind)
+        _put_varint(buf, len(body))
+        buf += body
+
+    def _symbol(self, buf, value):
+        index = self._symbols.get(value)
+        if index is None:
+            _put_varint(buf, 0)
+            _put_string(buf, str(value))
+        else:
+            _put_varint(buf, index)
+
+    def _encode_fields(self, kind, fields):
+        buf = bytearray()
+        if kind in (CHANNEL, NAME):
+            _put_string(buf, fields[0] or "")
+        elif kind == SESSION:
+            self._symbol(buf, fields[0])
+            _put_varint(buf, int(fields[1]))
+            _put_varint(buf, fields[2])
+        elif kind == DIFFICULTY:
+            self._symbol(buf, fields[0])
+        elif kind == INPUT:
+            source, value, pressed = fields
+            _put_varint(buf, INPUT_SOURCES.index(source) << 1 | bool(pressed))
+            self._symbol(buf, value)
+        elif kind == LED:
+            color, on = fields
+            _put_varint(buf, self._symbols[color] << 1 | bool(on))
+        elif kind == END:
+            _put_varint(buf, max(0, int(fields[0])))
+            self._symbol(buf, fields[1])
+            _put_varint(buf, fields[2])
+        return buf
+
+
+class SessionRecorder:
+    """Handle einer Station auf das gemeinsame Log; record() blockiert nie."""
+
+    __slots__ = ("_log", "channel")
+
+    def __init__(self, session_log, channel):
+        self._log = session_log
+        self.channel = channel
+
+    def record(self, kind, timestamp, *fields):
+        self._log._put((self.channel, kind, timestamp, fields))
+
+
+# --- Lesen ---
+
+
+class Session:
+    """Ein aufgezeichnetes Spiel (Zeiten in Sekunden der Uhr des Spiels)."""
+
+    def __init__(self, station, difficulty, started_at, wall_time, seed):
+        self.station = station
+        self.difficulty = difficulty
+        self.started_at = started_at
+        self.wall_time = wall_time
+        self.seed = seed
+        # Farbfolge, beim END-Record aus (seed, Länge) neu erzeugt
+        self.steps = PackedSequence(seed)
+        self.inputs = []  # (zeit, quelle, wert, gedrückt)
+        self.leds = []  # (zeit, farbe, an)
+        self.difficulties = []  # (zeit, stufe)
+        self.name = None
+        self.name_at = None
+        self.score = None
+        self.reason = None
+        self.ended_at = None
+
+    @property
+    def complete(self):
+        return self.ended_at is not None
+
+    def __repr__(self):
+        return (
+            f"<Session {self.station} {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(self.wall_time))} "
+            f"{self.difficulty} score={self.score} steps={len(self.steps)} inputs={len(self.inputs)}>"
+        )
+
+
+def read_records(path):
+    """
+    Liefert (typ, station, zeit, felder) für alle Records. Ein abgeschnittener
+    letzter Record (z.B. nach Stromausfall) beendet das Lesen ohne Fehler.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    if not data.startswith(MAGIC):
+        raise ValueError(f"{path} ist kein Session-Log")
+    reader = _Reader(data, len(MAGIC))
+    symbols = [None] + [reader.string() for _ in range(reader.varint())]
+    channels = {}
+    base = 0
+
+    def symbol(r):
+        index = r.varint()
+        return r.string() if index == 0 else symbols[index]
+
+    while reader.pos < len(data):
+        start = reader.pos
+        try:
+            kind = data[reader.pos]
+            reader.pos += 1
+            end = reader.varint()
+            end += reader.pos
+            if end > len(data):
+                raise IndexError
+            body = _Reader(data, reader.pos)
+            reader.pos = end
+            if kind == INDEX:
+                base = body.varint()
+                continue
+            channel = body.varint()
+            base += _unzigzag(body.varint())
+            if kind == CHANNEL:
+                channels[channel] = body.string()
+                continue
+            station = channels.get(channel)
+            timestamp = base / 1_000_000
+            if kind == SESSION:
+                yield kind, station, timestamp, (symbol(body), body.varint(), body.varint())
+            elif kind == DIFFICULTY:
+                yield kind, station, timestamp, (symbol(body),)
+            elif kind == INPUT:
+                flags = body.varint()
+                yield kind, station, timestamp, (INPUT_SOURCES[flags >> 1], symbol(body), bool(flags & 1))
+            elif kind == LED:
+                value = body.varint()
+                yield kind, station, timestamp, (symbols[value >> 1], bool(value & 1))
+            elif kind == NAME:
+                yield kind, station, timestamp, (body.string(),)
+            elif kind == END:
+                yield kind, station, timestamp, (body.varint(), symbol(body), body.varint())
+            # unbekannte Typen: überspringen
+        except IndexError:
+            log.warning("Session-Log %s endet mitten im Record bei Byte %d", path, start)
+            return
+
+
+def read_sessions(path):
+    """Gruppiert die Records zu Sessions (in Startreihenfolge, über alle Stationen)."""
+    sessions = []
+    open_sessions = {}
+    for kind, station, timestamp, fields in read_records(path):
+        if kind == SESSION:
+            session = Session(station, fields[0], timestamp, fields[1], fields[2])
+            open_sessions[station] = session
+            sessions.append(session)
+            continue
+        session = open_sessions.get(station)
+        if session is None:
+            continue
+        if kind == INPUT:
+            session.inputs.append((timestamp,) + fields)
+        elif kind == LED:
+            session.leds.append((timestamp,) + fields)
+        elif kind == DIFFICULTY:
+            session.difficulties.append((timestamp, fields[0]))
+        elif kind == NAME:
+            session.name, session.name_at = fields[0], timestamp
+        elif kind == END:
+            session.score, session.reason, length = fields
+            session.ended_at = timestamp
+            session.steps = PackedSequence.regenerate(session.seed, length)
+            del open_sessions[station]
+    return sessions
+
+
+# --- Replay ---
+
+ReplayResult = namedtuple(
+    "ReplayResult", "score recorded_score sequence_ok leds_ok leds virtual_seconds wall_seconds"
+)
+
+
+def replay(session, speed=None):
+    """
+    Spielt eine Session auf virtueller Uhr mit denselben Eingaben zu denselben
+    Zeitpunkten nach. speed=None läuft so schnell wie möglich, sonst mit
+    speed-facher Echtzeit (z.B. 10 = zehnmal so schnell).
+    """
+    from app.clock import VirtualClock
+    from app.gpio_logic import SimonSaysGame
+    from app.simulation import SimulatedBoard
+
+    clock = VirtualClock(start=session.started_at)
+    board = SimulatedBoard()
+    leds = []
+    submitted = []
+
+    class _Writer:
+        def submit(self, name, score, **extra):
+            submitted.append((name, score))
+
+    def on_emit(event, data):
+        if event == "led_state":
+            leds.append((data["color"], data["state"] == "on"))
+
+    game = SimonSaysGame(
+        socket_callback=on_emit,
+        highscore_writer=_Writer(),
+        clock=clock,
+        board=board,
+        station=session.station,
+    )
+    game.apply_difficulty(session.difficulty)
+
+    wall_start = time.perf_counter()
+
+    def at(timestamp, action):
+        def run():
+            if speed:
+                delay = wall_start + (timestamp - session.started_at) / speed - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            action()
+
+        clock.call_at(timestamp, run)
+
+    for timestamp, source, value, pressed in session.inputs:
+        if source == SOURCE_WEB:
+            if pressed:
+                at(timestamp, lambda v=value, t=timestamp: game.process_remote_input(v, sid="replay", received_at=t))
+        elif source == SOURCE_HARDWARE:
+            button = board.buttons[value]
+            at(timestamp, button.press if pressed else button.release)
+        elif source == SOURCE_SNES:
+            target = SNES_MAPPING.get(value)
+            at(timestamp, lambda n=value, g=target, p=pressed: game._feed_snes_edge(n, g, p))
+    for timestamp, level in session.difficulties:
+        at(timestamp, lambda level=level: game.set_difficulty(level))
+    if session.name is not None:
+        at(session.name_at, lambda: game.on_name_submitted(session.name))
+
+    game.run_game(seed=session.seed)
+    recorded = [(color, on) for _, color, on in session.leds]
+    return ReplayResult(
+        score=max(0, len(game.sequence) - 1),
+        recorded_score=session.score,
+        sequence_ok=game.sequence == session.steps,
+        leds_ok=leds == recorded,
+        leds=len(leds),
+        virtual_seconds=clock.now() - session.started_at,
+        wall_seconds=time.perf_counter() - wall_start,
+    )
@@ -1,32 +1,168 @@
+import bisect
+import threading
+from datetime import datetime
 from flask import g
 from app.db import get_db
+from app.config import LEADERBOARD_CACHE_SIZE
+from app.metrics import DB_QUERY_SECONDS, DB_COMMIT_SECONDS
 
-def add_highscore(name, score):
+
+class LeaderboardCache:
     """
-    Fügt einen neuen Highscore in die SQLite-Datenbank ein.
+    Die besten K Einträge im Speicher, sortiert wie idx_highscore_score
+    (score absteigend, dann timestamp, dann id).
+
+    Wird beim Start aus der DB gefüllt und von add_highscore fortgeschrieben.
+    Ändert sich die Top-N-Liste eines Listeners tatsächlich, wird er mit den
+    neuen Top-N aufgerufen (z.B. um update_highscores an alle Clients zu pushen).
     """
+
+    def __init__(self, size=LEADERBOARD_CACHE_SIZE):
+        self.size = size
+        self._lock = threading.Lock()
+        self._keys = []
+        self._entries = []
+        self._listeners = []
+        self.warm = False
+        # Fertig aufbereitete Antwort, wird nur bei Änderungen neu gebaut
+        self.payload = []
+
+    @staticmethod
+    def _key(entry):
+        return (-entry['score'], entry['timestamp'] or "", entry['id'])
+
+    def _rebuild_payload(self):
+        self.payload = [
+            {'name': e['name'], 'score': e['score'], 'timestamp': e['timestamp']} for e in self._entries
+        ]
+
+    def load(self, entries):
+        with self._lock:
+            ordered = sorted(entries, key=self._key)[: self.size]
+            self._keys = [self._key(e) for e in ordered]
+            self._entries = ordered
+            self._rebuild_payload()
+            self.warm = True
+
+    def offer(self, entry):
+        """Nimmt einen neuen Eintrag auf. Gibt True zurück, wenn sich die Top-K geändert haben."""
+        with self._lock:
+            if not self.warm:
+                return False
+            key = self._key(entry)
+            if len(self._keys) >= self.size and key >= self._keys[-1]:
+                return False
+            pos = bisect.bisect_left(self._keys, key)
+            self._keys.insert(pos, key)
+            self._entries.insert(pos, entry)
+            if len(self._keys) > self.size:
+                self._keys.pop()
+                self._entries.pop()
+            self._rebuild_payload()
+            payload = self.payload
+        for limit, listener in list(self._listeners):
+            if pos < limit:
+                listener(payload[:limit])
+        return True
+
+    def top(self, limit):
+        """Top-N aus dem Speicher oder None, wenn der Cache das nicht abdecken kann."""
+        if not self.warm or limit > self.size:
+            return None
+        payload = self.payload
+        return payload[:limit]
+
+    def on_change(self, callback, limit=10):
+        """callback(top_n) wird nur aufgerufen, wenn sich die ersten `limit` Plätze ändern."""
+        self._listeners.append((limit, callback))
+
+
+leaderboard = LeaderboardCache()
+
+
+def warm_leaderboard():
+    """Füllt den Top-K-Cache aus der Datenbank (einmal beim Start)."""
     db = get_db()
     cursor = db.cursor()
-    
-    query = "INSERT INTO highscore (name, score) VALUES (?, ?)"
-    cursor.execute(query, (name, score))
-    db.commit()
+    with DB_QUERY_SECONDS.time(("warm_leaderboard",)):
+        cursor.execute(
+            "SELECT id, name, score, timestamp FROM highscore ORDER BY score DESC, timestamp, id LIMIT ?",
+            (leaderboard.size,),
+        )
+        rows = cursor.fetchall()
+    leaderboard.load([dict(row) for row in rows])
     cursor.close()
 
+
+def make_highscore(name, score, difficulty=None, station=None, sequence_length=None, duration_ms=None):
+    """Baut einen Highscore-Eintrag; der Zeitstempel wird sofort festgelegt."""
+    return {
+        'name': name,
+        'score': score,
+        # Gleiches Format wie CURRENT_TIMESTAMP, damit Cache und DB identisch sortieren
+        'timestamp': datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S'),
+        'difficulty': difficulty,
+        'station': station,
+        'sequence_length': sequence_length,
+        'duration_ms': duration_ms,
+    }
+
+
+def insert_highscores(db, entries):
+    """
+    Schreibt mehrere Einträge in EINER Transaktion (ein fsync) und
+    schreibt danach den Leaderboard-Cache fort.
+    """
+    query = (
+        "INSERT INTO highscore (name, score, timestamp, difficulty, station, sequence_length, duration_ms) "
+        "VALUES (:name, :score, :timestamp, :difficulty, :station, :sequence_length, :duration_ms)"
+    )
+    cursor = db.cursor()
+    try:
+        with DB_COMMIT_SECONDS.time():
+            cursor.execute("BEGIN IMMEDIATE")
+            for entry in entries:
+                cursor.execute(query, entry)
+                entry['id'] = cursor.lastrowid
+            db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        cursor.close()
+
+    # Write-Through: Cache nach erfolgreichem Commit fortschreiben
+    for entry in entries:
+        leaderboard.offer(entry)
+
+
+def add_highscore(name, score, difficulty=None, station=None, sequence_length=None, duration_ms=None):
+    """
+    Fügt einen neuen Highscore synchron in die SQLite-Datenbank ein.
+    Im laufenden Spiel geht das über den HighscoreWriter (write-behind).
+    """
+    insert_highscores(get_db(), [make_highscore(name, score, difficulty, station, sequence_length, duration_ms)])
+
 def get_top_highscores(limit=10):
     """
-    Gibt die Top N Highscores aus der SQLite-Datenbank zurück.
+    Gibt die Top N Highscores zurück - aus dem Cache, sonst aus der SQLite-Datenbank.
     """
+    cached = leaderboard.top(limit)
+    if cached is not None:
+        return cached
+
     db = get_db()
     cursor = db.cursor()
-    
+
     # SQLite nutzt ? als Platzhalter und Row-Factory für Dict-ähnlichen Zugriff
-    query = "SELECT name, score, timestamp FROM highscore ORDER BY score DESC LIMIT ?"
-    cursor.execute(query, (limit,))
-    
-    result = cursor.fetchall()
+    # Sortierung entspricht idx_highscore_score -> Index-Scan statt Full-Scan + Sort
+    query = "SELECT name, score, timestamp FROM highscore ORDER BY score DESC, timestamp, id LIMIT ?"
+    with DB_QUERY_SECONDS.time(("top_highscores",)):
+        cursor.execute(query, (limit,))
+        result = cursor.fetchall()
+
     formatted_result = []
-    
+
     for row in result:
         # sqlite3.Row in Dict umwandeln
         item = {
@@ -35,6 +171,85 @@ def get_top_highscores(limit=10):
             'timestamp': row['timestamp']
         }
         formatted_result.append(item)
-        
+
     cursor.close()
     return formatted_result
+
+
+LEADERBOARD_FIELDS = ['id', 'name', 'score', 'timestamp', 'difficulty']
+
+
+def get_leaderboard_page(limit=50, after=None, difficulty=None, since=None, name=None):
+    """
+    Eine Seite der Rangliste per Keyset-Pagination.
+
+    `after` ist (score, id) des letzten Eintrags der vorherigen Seite. Die
+    Abfrage springt über den Index direkt dorthin, statt wie bei OFFSET alle
+    vorherigen Zeilen zu überlesen - Seite 500 kostet so viel wie Seite 1.
+    Rückgabe: kompakte Zeilen in der Reihenfolge von LEADERBOARD_FIELDS.
+    """
+    where = []
+    params = []
+    if difficulty:
+        where.append("difficulty = ?")
+        params.append(difficulty)
+    if name:
+        where.append("name = ?")
+        params.append(name)
+    if since:
+        where.append("timestamp >= ?")
+        params.append(since)
+    if after:
+        score, row_id = after
+        # Bereich über den Index eingrenzen, Gleichstand über die id auflösen
+        where.append("score <= ? AND (score < ? OR id > ?)")
+        params.extend([score, score, row_id])
+
+    query = "SELECT id, name, score, timestamp, difficulty FROM highscore"
+    if where:
+        query += " WHERE " + " AND ".join(where)
+    query += " ORDER BY score DESC, id LIMIT ?"
+    params.append(limit)
+
+    db = get_db()
+    cursor = db.cursor()
+    with DB_QUERY_SECONDS.time(("leaderboard_page",)):
+        cursor.execute(query, params)
+        rows = [tuple(row) for row in cursor.fetchall()]
+    cursor.close()
+    return rows
+
+
+def get_player_rank(name, difficulty=None):
+    """
+    Bester Eintrag eines Spielers und dessen Platz (1-basiert) oder None.
+    Der Platz ist ein COUNT über den Bereich vor dem Eintrag im Score-Index.
+    """
+    with DB_QUERY_SECONDS.time(("player_rank",)):
+        return _player_rank(name, difficulty)
+
+
+def _player_rank(name, difficulty):
+    db = get_db()
+    cursor = db.cursor()
+    filter_sql = " AND difficulty = ?" if difficulty else ""
+    filter_params = [difficulty] if difficulty else []
+
+    cursor.execute(
+        "SELECT id, name, score, timestamp, difficulty FROM highscore WHERE name = ?"
+        + filter_sql
+        + " ORDER BY score DESC, id LIMIT 1",
+        [name] + filter_params,
+    )
+    best = cursor.fetchone()
+    if best is None:
+        cursor.close()
+        return None
+
+    cursor.execute(
+        "SELECT COUNT(*) FROM highscore WHERE score >= ? AND (score > ? OR id < ?)" + filter_sql,
+        [best['score'], best['score'], best['id']] + filter_params,
+    )
+    rank = cursor.fetchone()[0] + 1
+    cursor.close()
+    return {'rank': rank, 'entry': tuple(best)}
@@ -1,5 +1,9 @@
-from flask import Blueprint, render_template, request, redirect, url_for, session, flash, jsonify
+from flask import Blueprint, render_template, request, redirect, url_for, session, flash, jsonify, current_app
+from flask_socketio import emit
 import app
+from app import socketio
+from app.latency import latency
+from app.metrics import SOCKET_CLIENTS
 
 admin_bp = Blueprint('admin', __name__, url_prefix='/admin')
 
@@ -56,3 +60,28 @@ def status_json():
         return jsonify(app.game_instance.get_debug_status())
     
     return jsonify({'error': 'Game instance not running'}), 500
+
+@admin_bp.route('/latency', methods=['GET', 'DELETE'])
+def latency_json():
+    """Latenz-Histogramme pro Messpfad (p50/p95/p99/max in ms); DELETE setzt sie zurück."""
+    if not is_logged_in():
+        return jsonify({'error': 'Unauthorized'}), 401
+
+    if request.method == 'DELETE':
+        latency.reset()
+    return jsonify(latency.summary())
+
+
+@socketio.on('connect', namespace='/admin')
+def handle_admin_connect():
+    # Die Flask-Session reist mit dem Handshake mit -> gleicher Login wie für die Seiten
+    if not is_logged_in():
+        raise ConnectionRefusedError('unauthorized')
+    SOCKET_CLIENTS.inc(('/admin',))
+    emit('debug_snapshot', current_app.debug_stream.client_connected())
+
+
+@socketio.on('disconnect', namespace='/admin')
+def handle_admin_disconnect():
+    SOCKET_CLIENTS.dec(('/admin',))
+    current_app.debug_stream.client_disconnected()
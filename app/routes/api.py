@@ -0,0 +1,81 @@
+from datetime import datetime, timedelta
+from flask import Blueprint, current_app, jsonify, request
+
+from app.repository import LEADERBOARD_FIELDS, get_leaderboard_page, get_player_rank
+
+api_bp = Blueprint('api', __name__, url_prefix='/api')
+
+MAX_PAGE_SIZE = 200
+PERIODS = {'day': timedelta(days=1), 'week': timedelta(days=7)}
+
+
+def _parse_cursor(raw):
+    """Cursor-Format: "<score>:<id>:<rang>" des letzten Eintrags der vorherigen Seite."""
+    score, row_id, rank = (int(part) for part in raw.split(':'))
+    return (score, row_id), rank
+
+
+def _since(period):
+    if not period:
+        return None
+    # Gleiches Format wie die gespeicherten Zeitstempel (UTC)
+    return (datetime.utcnow() - PERIODS[period]).strftime('%Y-%m-%d %H:%M:%S')
+
+
+@api_bp.route('/leaderboard')
+def leaderboard():
+    """
+    Rangliste als JSON mit Keyset-Pagination.
+    Parameter: limit, cursor, difficulty, period (day|week), player
+    """
+    period = request.args.get('period')
+    if period and period not in PERIODS:
+        return jsonify({'error': f'Unbekannter Zeitraum: {period}'}), 400
+
+    after, rank = None, 0
+    cursor = request.args.get('cursor')
+    if cursor:
+        try:
+            after, rank = _parse_cursor(cursor)
+        except ValueError:
+            return jsonify({'error': 'Ungültiger Cursor'}), 400
+
+    limit = max(1, min(request.args.get('limit', 50, type=int), MAX_PAGE_SIZE))
+    rows = get_leaderboard_page(
+        limit=limit,
+        after=after,
+        difficulty=request.args.get('difficulty'),
+        since=_since(period),
+        name=request.args.get('player'),
+    )
+
+    next_cursor = None
+    if len(rows) == limit:
+        last = rows[-1]
+        next_cursor = f"{last[2]}:{last[0]}:{rank + len(rows)}"
+
+    return jsonify({
+        'fields': LEADERBOARD_FIELDS,
+        'first_rank': rank + 1,
+        'rows': rows,
+        'next_cursor': next_cursor,
+    })
+
+
+@api_bp.route('/leaderboard/rank')
+def player_rank():
+    """Platz und bester Eintrag eines Spielers (optional je Schwierigkeit)."""
+    name = request.args.get('player')
+    if not name:
+        return jsonify({'error': 'Parameter player fehlt'}), 400
+
+    result = get_player_rank(name, difficulty=request.args.get('difficulty'))
+    if result is None:
+        return jsonify({'error': 'Spieler nicht gefunden'}), 404
+    return jsonify({'fields': LEADERBOARD_FIELDS, 'rank': result['rank'], 'entry': result['entry']})
+
+
+@api_bp.route('/stations')
+def stations():
+    """Alle Stationen des Prozesses mit Zustand und Anzahl verbundener Clients."""
+    return jsonify(current_app.stations.summary())
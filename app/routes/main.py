@@ -1,5 +1,5 @@
 import json
-from flask import Blueprint, render_template, current_app
+from flask import Blueprint, render_template, current_app, request
 from app import socketio
 # from app.models import Highscore # Removed
 from app.repository import get_top_highscores
@@ -8,18 +8,23 @@ from flask_socketio import emit
 # Blueprint definieren
 main_bp = Blueprint('main', __name__)
 
+def _station_id():
+    """?station=<id> der Seite; unbekannte Stationen fallen auf die erste zurück."""
+    station = current_app.stations.get(request.args.get('station')) or current_app.stations.default
+    return station.id if station is not None else None
+
 @main_bp.route('/')
 def dashboard():
     """Die Hauptseite mit den Highscores."""
     # Top 10 Highscores aus der DB laden
     scores = get_top_highscores(limit=10)
-    return render_template('dashboard.html', scores=scores)
+    return render_template('dashboard.html', scores=scores, station=_station_id())
 
 @main_bp.route('/remote')
 def remote():
-    """Die Seite für die Echtzeit-Fernsteuerung/Anzeige."""
+    """Die Seite für die Echtzeit-Fernsteuerung/Anzeige (einer Station)."""
     from app.config import DIFFICULTY_SETTINGS
-    return render_template('remote.html', difficulty_settings=DIFFICULTY_SETTINGS)
+    return render_template('remote.html', difficulty_settings=DIFFICULTY_SETTINGS, station=_station_id())
 
 # --- SocketIO Event Handler für Highscores ---
 
@@ -33,8 +38,9 @@ def handle_submit_highscore(data):
     if not name:
         return
 
-    if current_app.game_instance:
-        current_app.game_instance.on_name_submitted(name)
+    station = current_app.stations.station_for(request.sid, '/')
+    if station:
+        station.game.on_name_submitted(name)
 
 
 @socketio.on('request_highscores')
@@ -0,0 +1,11 @@
+from flask import Blueprint, Response
+
+from app.metrics import registry
+
+metrics_bp = Blueprint('metrics', __name__)
+
+
+@metrics_bp.route('/metrics')
+def metrics():
+    """Alle Zähler im Prometheus-Textformat (liest nur, nimmt keine Spiel-Locks)."""
+    return Response(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
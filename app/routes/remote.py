@@ -1,8 +1,12 @@
-from flask import Blueprint, current_app
+import logging
+import time
+from flask import Blueprint, current_app, request
 from flask_socketio import emit
 from app import socketio
+from app.metrics import SOCKET_CLIENTS
 
 remote_bp = Blueprint("remote", __name__)
+log = logging.getLogger(__name__)
 
 
 def game_socket_callback(event, data):
@@ -10,33 +14,61 @@ def game_socket_callback(event, data):
     socketio.emit(event, data, namespace="/remote")
 
 
+def _station():
+    """Station des anfragenden Remote-Clients (siehe app/stations.py)."""
+    return current_app.stations.station_for(request.sid, "/remote")
+
+
+def _game():
+    station = _station()
+    return station.game if station is not None else None
+
+
 @socketio.on("connect", namespace="/remote")
 def handle_connect():
-    print("Remote-Client verbunden!")
+    log.info("Remote-Client verbunden: %s", request.sid, extra={"event": "client_connect"})
+    # Jede Remote spielt an genau einer Station: ?station=<id> beim Handshake
+    station_id = request.args.get("station")
+    station = current_app.stations.join(request.sid, "/remote", station_id)
+    if station is None and station_id is not None:
+        raise ConnectionRefusedError("unknown station")
+    SOCKET_CLIENTS.inc(("/remote",))
+    # Den Zustand holt sich der Client selbst per 'resync' mit seiner letzten seq
     emit("game_status", {"msg": "Remote verbunden"})
 
-    if current_app.game_instance:
-        emit("led_snapshot", {"states": current_app.game_instance.get_led_snapshot()})
-        emit("difficulty_changed", {"level": current_app.game_instance.current_difficulty})
 
-    import app
+@socketio.on("disconnect", namespace="/remote")
+def handle_disconnect():
+    current_app.stations.leave(request.sid, "/remote")
+    SOCKET_CLIENTS.dec(("/remote",))
 
-    if app.game_instance:
-        emit("led_snapshot", {"states": app.game_instance.get_led_snapshot()})
+
+@socketio.on("join_station", namespace="/remote")
+def handle_join_station(data=None):
+    """Wechselt die Station; der Client bekommt einen vollen Snapshot (andere seq-Folge)."""
+    station_id = data.get("station") if isinstance(data, dict) else None
+    station = current_app.stations.join(request.sid, "/remote", station_id)
+    if station is None:
+        emit("station_error", {"station": station_id, "error": "unknown station"})
+        return
+    emit("station_joined", {"station": station.id})
+    emit("state_sync", station.state_stream.snapshot())
 
 
 @socketio.on("remote_input", namespace="/remote")
 def handle_remote_input(data):
+    received_at = time.monotonic()
     color = data.get("color")
-    print(f"Web-Input empfangen: {color}")
+    log.info("Web-Input empfangen: %s", color, extra={"event": "remote_input"})
 
-    if current_app.game_instance:
+    game = _game()
+    if game:
         # Wir schicken NUR den Input an die Logik.
-        # Die Logik ruft dann flash_led() auf, was das 'on' UND 'off' Signal
-        # an alle Browser sendet.
-        current_app.game_instance.process_remote_input(color)
+        # Die Logik plant den Flash, der Broadcaster schickt das 'on' UND 'off'
+        # als led_frame an alle Browser der Station.
+        game.process_remote_input(color, sid=request.sid, received_at=received_at)
     else:
-        print("Fehler: game_instance ist nicht initialisiert!")
+        log.error("game_instance ist nicht initialisiert!")
 
 
 @socketio.on("change_difficulty", namespace="/remote")
@@ -44,34 +76,48 @@ def handle_difficulty(data):
     level = data.get("level")
     from app.config import DIFFICULTY_SETTINGS
 
-    if level in DIFFICULTY_SETTINGS and current_app.game_instance:
-        current_app.game_instance.set_difficulty(level)
+    game = _game()
+    if level in DIFFICULTY_SETTINGS and game:
+        game.set_difficulty(level)
 
 
 @socketio.on("submit_highscore", namespace="/remote")
 def handle_submit_highscore(data):
     name = data.get("name")
-    print(f"Highscore-Name empfangen: {name}")
-    if current_app.game_instance:
+    log.info("Highscore-Name empfangen: %s", name)
+    game = _game()
+    if game:
         # Reicht den Namen an die Spiellogik weiter
-        current_app.game_instance.on_name_submitted(name)
+        game.on_name_submitted(name)
 
 
 @socketio.on("start_game", namespace="/remote")
 def handle_start_game():
-    if current_app.game_instance:
-        current_app.game_instance.process_remote_input("START_SIGNAL")
+    game = _game()
+    if game:
+        game.process_remote_input("START_SIGNAL", sid=request.sid)
 
 
 @socketio.on("request_snapshot", namespace="/remote")
 def handle_request_snapshot():
-    if current_app.game_instance:
-        emit("led_snapshot", {"states": current_app.game_instance.get_led_snapshot()})
-        emit("difficulty_changed", {"level": current_app.game_instance.current_difficulty})
+    game = _game()
+    if game:
+        emit("led_snapshot", {"states": game.get_led_snapshot()})
+        emit("difficulty_changed", {"level": game.current_difficulty})
+
+
+@socketio.on("resync", namespace="/remote")
+def handle_resync(data=None):
+    """Client schickt seine letzte seq und bekommt nur die fehlenden Deltas."""
+    seq = data.get("seq") if isinstance(data, dict) else None
+    station = _station()
+    if station:
+        emit("state_sync", station.state_stream.since(seq))
 
 
 @socketio.on("request_led_snapshot", namespace="/remote")
 def handle_request_led_snapshot():
     """Alias für ältere/alternative Frontends."""
-    if current_app.game_instance:
-        emit("led_snapshot", {"states": current_app.game_instance.get_led_snapshot()})
+    game = _game()
+    if game:
+        emit("led_snapshot", {"states": game.get_led_snapshot()})
@@ -0,0 +1,118 @@
+from app.config import HARDWARE_SETUP
+
+# Farbtabelle: Index <-> Farbe (Reihenfolge wie HARDWARE_SETUP)
+COLORS = tuple(HARDWARE_SETUP)
+
+_MASK = (1 << 64) - 1
+_GOLDEN = 0x9E3779B97F4A7C15
+
+
+def step_index(seed, position, count=len(COLORS)):
+    """
+    Farbindex des Schritts `position` für einen Seed (SplitMix64 auf einem
+    Zähler). Jeder Schritt hängt nur von (seed, position) ab, nicht von den
+    vorherigen.
+    """
+    z = (seed + (position + 1) * _GOLDEN) & _MASK
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & _MASK
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & _MASK
+    return (((z ^ (z >> 31)) >> 32) * count) >> 32
+
+
+class PackedSequence:
+    """
+    Farbfolge mit 2 Bit pro Schritt (4 Schritte pro Byte in einem bytearray).
+
+    Verhält sich beim Lesen wie eine Liste von Farbnamen (len, Index, Iteration,
+    Vergleich mit Listen). Mit Seed lässt sich die Folge jederzeit aus
+    (seed, Länge) neu erzeugen, statt sie zu speichern.
+    """
+
+    __slots__ = ("colors", "seed", "_data", "_length", "_lookup")
+
+    def __init__(self, seed=0, colors=COLORS):
+        if not 0 < len(colors) <= 4:
+            raise ValueError("PackedSequence unterstützt 1 bis 4 Farben")
+        self.colors = tuple(colors)
+        self.seed = seed & _MASK
+        self._data = bytearray()
+        self._length = 0
+        self._lookup = {color: index for index, color in enumerate(self.colors)}
+
+    @classmethod
+    def regenerate(cls, seed, length, colors=COLORS):
+        """Dieselbe Folge wie ein Spiel mit diesem Seed nach `length` Runden."""
+        sequence = cls(seed, colors)
+        sequence.extend_random(length)
+        return sequence
+
+    def append_index(self, index):
+        shift = (self._length & 3) << 1
+        if not shift:
+            self._data.append(index)
+        else:
+            self._data[-1] |= index << shift
+        self._length += 1
+
+    def append(self, color):
+        self.append_index(self._lookup[color])
+
+    def extend_random(self, count=1):
+        """Hängt die nächsten `count` Schritte aus dem Seed an; gibt den letzten Index zurück."""
+        index = None
+        seed, colors = self.seed, len(self.colors)
+        for position in range(self._length, self._length + count):
+            index = step_index(seed, position, colors)
+            self.append_index(index)
+        return index
+
+    def index_at(self, position):
+        if position < 0:
+            position += self._length
+        if not 0 <= position < self._length:
+            raise IndexError("PackedSequence index out of range")
+        return (self._data[position >> 2] >> ((position & 3) << 1)) & 3
+
+    def indices(self):
+        length = self._length
+        position = 0
+        for byte in self._data:
+            for shift in (0, 2, 4, 6):
+                if position == length:
+                    return
+                yield (byte >> shift) & 3
+                position += 1
+
+    def clear(self):
+        self._data.clear()
+        self._length = 0
+
+    def to_bytes(self):
+        return bytes(self._data)
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self.colors[self.index_at(i)] for i in range(*position.indices(self._length))]
+        return self.colors[self.index_at(position)]
+
+    def __iter__(self):
+        colors = self.colors
+        for index in self.indices():
+            yield colors[index]
+
+    def __eq__(self, other):
+        if isinstance(other, PackedSequence):
+            return self.colors == other.colors and self._length == other._length and self._data == other._data
+        try:
+            return len(other) == self._length and all(a == b for a, b in zip(self, other))
+        except TypeError:
+            return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        preview = ", ".join(self[:8]) + (", ..." if self._length > 8 else "")
+        return f"PackedSequence(seed={self.seed:#x}, len={self._length}, [{preview}])"
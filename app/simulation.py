@@ -0,0 +1,187 @@
+import random
+import time
+from collections import Counter, namedtuple
+
+from app.clock import VirtualClock
+from app.config import DIFFICULTY_BUTTONS, HARDWARE_SETUP, SNES_MAPPING
+from app.hardware import VirtualBoard
+from app.input_engine import INPUT_SOURCES, SOURCE_HARDWARE, SOURCE_WEB, SOURCE_SNES
+
+# Headless-Simulation des Spiels: virtuelle Uhr, gesäter Zufall, simuliertes
+# Board und skriptbare Spieler. Ein Spiel mit 20 Runden dauert so Millisekunden
+# statt Minuten - für Tests und Benchmarks ohne Raspberry Pi und ohne Tk.
+
+PLAYER_SOURCES = (SOURCE_HARDWARE, SOURCE_WEB, SOURCE_SNES)
+
+# Farbe -> SNES-Taste (Umkehrung von SNES_MAPPING)
+_SNES_BUTTON_FOR = {target: name for name, target in SNES_MAPPING.items()}
+
+GameResult = namedtuple("GameResult", "score rounds virtual_seconds wall_seconds cpu_seconds emits")
+
+
+class SimulatedOutput:
+    """LED bzw. Buzzer ohne Hardware: merkt sich nur den Zustand."""
+
+    def __init__(self):
+        self.is_lit = False
+
+    def on(self):
+        self.is_lit = True
+
+    def off(self):
+        self.is_lit = False
+
+
+class SimulatedButton:
+    """Taster mit denselben Callback-Attributen wie gpiozero.Button."""
+
+    def __init__(self):
+        self.is_pressed = False
+        self.when_pressed = None
+        self.when_released = None
+
+    def press(self):
+        self.is_pressed = True
+        if self.when_pressed:
+            self.when_pressed()
+
+    def release(self):
+        self.is_pressed = False
+        if self.when_released:
+            self.when_released()
+
+
+class SimulatedBoard(VirtualBoard):
+    """
+    VirtualBoard mit simulierten Tastern und Ausgängen, damit skriptbare
+    Spieler auch Hardware- und SNES-Eingaben (durch den Debouncer) erzeugen.
+    """
+
+    input_sources = INPUT_SOURCES
+    mode = "SIMULATION"
+
+    def __init__(self):
+        super().__init__()
+        self.leds = {color: SimulatedOutput() for color in HARDWARE_SETUP}
+        self.buttons = {color: SimulatedButton() for color in HARDWARE_SETUP}
+        self.difficulty_buttons = {level: SimulatedButton() for level in DIFFICULTY_BUTTONS}
+        self.buzzer = SimulatedOutput()
+
+
+class ScriptedPlayer:
+    """
+    Spielt über eine Quelle (hardware, web, snes) fehlerfrei bis zur Runde
+    `rounds` und drückt dort beim letzten Element bewusst falsch.
+    Reaktions- und Haltezeiten streuen reproduzierbar über den eigenen Seed.
+    """
+
+    def __init__(self, source=SOURCE_WEB, rounds=10, reaction=0.35, hold=0.12, jitter=0.1, seed=0, name="SIM"):
+        if source not in PLAYER_SOURCES:
+            raise ValueError(f"Unbekannte Quelle: {source}")
+        self.source = source
+        self.rounds = rounds
+        self.reaction = reaction
+        self.hold = hold
+        self.jitter = jitter
+        self.rng = random.Random(seed)
+        self.name = name
+
+    def _delay(self, base):
+        return base * (1.0 + self.rng.uniform(-self.jitter, self.jitter))
+
+    def answers(self, sequence, colors):
+        """Die Eingaben für eine Runde (ggf. mit absichtlichem Fehler am Ende)."""
+        answers = list(sequence)
+        if len(sequence) >= self.rounds:
+            answers[-1] = next(c for c in colors if c != sequence[-1])
+        return answers
+
+    def schedule_round(self, sim):
+        """Plant alle Tastendrücke der Runde als Timer auf der virtuellen Uhr."""
+        at = sim.clock.now()
+        for color in self.answers(sim.game.sequence, sim.game.colors):
+            at += self._delay(self.reaction)
+            sim.clock.call_at(at, lambda c=color: self.press(sim, c))
+            at += self._delay(self.hold)
+            sim.clock.call_at(at, lambda c=color: self.release(sim, c))
+
+    def press(self, sim, color):
+        # Hardware und SNES liefern Rohflanken und laufen damit durch den Debouncer
+        if self.source == SOURCE_WEB:
+            sim.game.process_remote_input(color, sid="sim", received_at=sim.clock.now())
+        elif self.source == SOURCE_SNES:
+            sim.game._feed_snes_edge(_SNES_BUTTON_FOR[color], color, True)
+        else:
+            sim.board.buttons[color].press()
+
+    def release(self, sim, color):
+        if self.source == SOURCE_SNES:
+            sim.game._feed_snes_edge(_SNES_BUTTON_FOR[color], color, False)
+        elif self.source == SOURCE_HARDWARE:
+            sim.board.buttons[color].release()
+
+    def schedule_name(self, sim):
+        sim.clock.call_later(self._delay(2.0), lambda: sim.game.on_name_submitted(self.name))
+
+
+class Simulation:
+    """
+    Ein SimonSaysGame auf virtueller Uhr und simuliertem Board.
+    Emits werden gezählt statt verschickt, Highscores nur gesammelt.
+    """
+
+    def __init__(self, seed=0, difficulty="medium"):
+        # Import hier, damit app.simulation ohne GPIO-Abhängigkeiten importierbar bleibt
+        from app.gpio_logic import SimonSaysGame
+
+        self.clock = VirtualClock()
+        self.board = SimulatedBoard()
+        self.emits = Counter()
+        self.highscores = []
+        self.player = None
+        self.game = SimonSaysGame(
+            socket_callback=self._on_emit,
+            highscore_writer=self,
+            clock=self.clock,
+            rng=random.Random(seed),
+            board=self.board,
+        )
+        self.game.set_difficulty(difficulty)
+        # Feedback der Schwierigkeitswahl abarbeiten, bevor gemessen wird
+        self.clock.sleep(1.0)
+        self.emits.clear()
+
+    def _on_emit(self, event, data):
+        self.emits[event] += 1
+        if self.player is None or event not in ("game_status", "request_name"):
+            return
+        if event == "request_name":
+            self.player.schedule_name(self)
+        elif data.get("msg") == "Du bist dran!":
+            self.player.schedule_round(self)
+
+    # Highscore-Writer-Schnittstelle (statt DB)
+    def submit(self, name, score, **extra):
+        entry = dict(extra, name=name, score=score)
+        self.highscores.append(entry)
+        return entry
+
+    def play(self, player):
+        """Spielt ein komplettes Spiel mit `player` und liefert Kennzahlen."""
+        self.player = player
+        self.emits.clear()
+        virtual_start = self.clock.now()
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            self.game.run_game()
+        finally:
+            self.player = None
+        return GameResult(
+            score=self.game.current_score,
+            rounds=len(self.game.sequence),
+            virtual_seconds=self.clock.now() - virtual_start,
+            wall_seconds=time.perf_counter() - wall_start,
+            cpu_seconds=time.process_time() - cpu_start,
+            emits=dict(self.emits),
+        )
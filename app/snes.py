@@ -0,0 +1,201 @@
+import atexit
+import logging
+import threading
+import time
+
+from app.config import SNES_SAMPLE_RATE, SNES_MAPPING
+
+log = logging.getLogger(__name__)
+
+# Reihenfolge der Bits im Schieberegister des Controllers
+SNES_BUTTON_NAMES = [
+    "B",
+    "Y",
+    "SELECT",
+    "START",
+    "UP",
+    "DOWN",
+    "LEFT",
+    "RIGHT",
+    "A",
+    "X",
+    "L",
+    "R",
+    "-",
+    "-",
+    "-",
+    "-",
+]
+
+# Bitmaske pro Taste: Bit i = i-ter Takt im Schieberegister, gesetzt = gedrückt
+SNES_MASKS = {name: 1 << i for i, name in enumerate(SNES_BUTTON_NAMES) if name != "-"}
+BUTTON_MASK = sum(SNES_MASKS.values())
+ALL_BITS = (1 << len(SNES_BUTTON_NAMES)) - 1
+_BIT_VALUES = tuple(1 << i for i in range(len(SNES_BUTTON_NAMES)))
+
+# Mehr gleichzeitig gedrückte Tasten sind physikalisch unplausibel -> Ghosting
+GHOST_THRESHOLD = 10
+
+# Mindestbreiten der Pulse laut Protokoll (Latch 12 µs, Clock-Halbperiode 6 µs)
+LATCH_PULSE = 12e-6
+CLOCK_HALF_PERIOD = 6e-6
+
+
+def _spin(seconds):
+    # time.sleep ist im µs-Bereich viel zu grob -> kurzes aktives Warten
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+class _DevicePin:
+    """Fallback für Devices ohne gpiozero-Pin-Objekt (z.B. GUI-Mock)."""
+
+    def __init__(self, device):
+        self._device = device
+
+    @property
+    def state(self):
+        # Wie bisher: Eingang mit Pull-Up ist "aktiv", wenn die Leitung LOW ist
+        return 0 if self._device.is_active else 1
+
+    @state.setter
+    def state(self, value):
+        if value:
+            self._device.on()
+        else:
+            self._device.off()
+
+
+def _low_level_pin(device):
+    # Direkt auf den Pin zugreifen spart die Device-Schicht (Lock, Wert-Umrechnung)
+    pin = getattr(device, "pin", None)
+    return pin if hasattr(pin, "state") else _DevicePin(device)
+
+
+class SnesSampler:
+    """
+    Liest den SNES-Controller genau einmal pro Frame (z.B. 60 Hz) auf einem
+    eigenen Thread und meldet nur Flanken über on_edge(name, target, pressed),
+    wobei target der Eintrag aus dem Mapping (oder None) ist.
+
+    Der Zustand ist ein einzelner 16-Bit-Integer; Flanken ergeben sich per XOR
+    mit dem vorherigen Frame, Namen und Ziele per Tabellen-Lookup. Damit liest
+    niemand sonst mehr das Schieberegister, und der Aufwand für den Controller
+    ist ein fester Betrag pro Frame (siehe stats()).
+    """
+
+    def __init__(self, latch, clock, data, on_edge, rate=SNES_SAMPLE_RATE, mapping=SNES_MAPPING):
+        self._latch = _low_level_pin(latch)
+        self._clock = _low_level_pin(clock)
+        self._data = _low_level_pin(data)
+        self._on_edge = on_edge
+        self.period = 1.0 / rate
+        # Pro Bitposition: (Name, Ziel); pro Ziel: Maske aller Tasten, die darauf zeigen
+        self._bit_table = tuple((name, mapping.get(name)) for name in SNES_BUTTON_NAMES)
+        self.target_masks = {}
+        for name, target in mapping.items():
+            if name in SNES_MASKS:
+                self.target_masks[target] = self.target_masks.get(target, 0) | SNES_MASKS[name]
+        self.state = 0
+        self._running = False
+        self._thread = None
+        self.frames = 0
+        self.overruns = 0
+        self.last_read_us = 0.0
+        self.max_read_us = 0.0
+
+    def read_frame(self):
+        """Ein vollständiger Lesevorgang; liefert die 16 Bits als Integer (gesetzt = gedrückt)."""
+        latch, clock, data = self._latch, self._clock, self._data
+        state = 0
+        latch.state = 1
+        _spin(LATCH_PULSE)
+        latch.state = 0
+        _spin(CLOCK_HALF_PERIOD)
+        for bit in _BIT_VALUES:
+            # Data ist aktiv-low: gedrückte Taste zieht die Leitung auf GND
+            if data.state == 0:
+                state |= bit
+            clock.state = 1
+            _spin(CLOCK_HALF_PERIOD)
+            clock.state = 0
+            _spin(CLOCK_HALF_PERIOD)
+        return state
+
+    def read_pressed(self):
+        """Gültige Tasten als Bitmaske oder None bei Ghosting."""
+        state = self.read_frame() & BUTTON_MASK
+        if state.bit_count() > GHOST_THRESHOLD:
+            return None
+        return state
+
+    def pressed_names(self):
+        state = self.state
+        return [name for name, mask in SNES_MASKS.items() if state & mask]
+
+    def is_target_held(self, target):
+        """Ist irgendeine Taste gedrückt, die auf target gemappt ist?"""
+        return bool(self.state & self.target_masks.get(target, 0))
+
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="snes-sampler", daemon=True)
+        self._thread.start()
+        # Vor dem Schließen der Pins durch gpiozero anhalten (atexit läuft in umgekehrter Reihenfolge)
+        atexit.register(self.stop)
+
+    def stop(self, timeout=1.0):
+        """Beendet das Abtasten und wartet auf den Sampler-Thread."""
+        self._running = False
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+
+    def _sample(self):
+        started = time.perf_counter()
+        pressed = self.read_pressed()
+        elapsed_us = (time.perf_counter() - started) * 1e6
+        self.last_read_us = elapsed_us
+        self.max_read_us = max(self.max_read_us, elapsed_us)
+        self.frames += 1
+        if pressed is None:
+            return  # Ghosting -> Frame verwerfen
+
+        changed = pressed ^ self.state
+        if not changed:
+            return
+        self.state = pressed
+        table = self._bit_table
+        while changed:
+            low = changed & -changed
+            changed ^= low
+            name, target = table[low.bit_length() - 1]
+            self._on_edge(name, target, bool(pressed & low))
+
+    def _run(self):
+        next_frame = time.monotonic()
+        while self._running:
+            try:
+                self._sample()
+            except Exception as exc:
+                log.error("SNES-Lesefehler: %s", exc)
+            next_frame += self.period
+            delay = next_frame - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                # Frame verpasst -> Takt neu ausrichten statt hinterherzuhetzen
+                self.overruns += 1
+                next_frame = time.monotonic()
+
+    def stats(self):
+        return {
+            "rate_hz": round(1.0 / self.period, 1),
+            "frames": self.frames,
+            "overruns": self.overruns,
+            "last_read_us": round(self.last_read_us, 1),
+            "max_read_us": round(self.max_read_us, 1),
+        }
@@ -0,0 +1,68 @@
+import threading
+from collections import deque
+
+from app.config import STATE_HISTORY_SIZE
+
+
+def delta_for_event(event, data):
+    """Übersetzt ein ausgehendes Event in eine Zustandsänderung (oder None)."""
+    if event == "led_frame":
+        return {"leds": data["changes"]}
+    if event == "difficulty_changed":
+        return {"difficulty": data["level"]}
+    if event == "game_status":
+        return {"status": data["msg"]}
+    if event == "game_over":
+        return {"score": data["score"]}
+    return None
+
+
+class StateStream:
+    """
+    Versionierter Spielzustand (LEDs, Schwierigkeit, Statusmeldung, Score).
+
+    Jede Änderung bekommt eine fortlaufende Sequenznummer und landet in einem
+    kleinen Ringpuffer. Ein Client, der sich neu verbindet, schickt seine
+    letzte Nummer und bekommt nur die fehlenden Deltas - oder einen vollen
+    Snapshot, wenn er zu weit zurückliegt.
+    """
+
+    def __init__(self, history=STATE_HISTORY_SIZE):
+        self._lock = threading.Lock()
+        self.seq = 0
+        self._state = {"leds": {}, "difficulty": None, "status": None, "score": 0}
+        self._deltas = deque(maxlen=history)
+
+    def record(self, delta):
+        """Wendet ein Delta an und gibt die neue Sequenznummer zurück."""
+        with self._lock:
+            self.seq += 1
+            for key, value in delta.items():
+                if key == "leds":
+                    self._state["leds"].update(value)
+                else:
+                    self._state[key] = value
+            self._deltas.append((self.seq, delta))
+            return self.seq
+
+    def snapshot(self):
+        with self._lock:
+            state = dict(self._state)
+            state["leds"] = dict(self._state["leds"])
+            return {"mode": "snapshot", "seq": self.seq, "state": state}
+
+    def since(self, seq):
+        """
+        Liefert alle Deltas nach `seq`. Fällt auf einen Snapshot zurück, wenn
+        die Nummer unbekannt ist oder schon aus dem Ringpuffer gefallen ist.
+        """
+        if not isinstance(seq, int) or seq < 0:
+            return self.snapshot()
+        with self._lock:
+            if seq == self.seq:
+                return {"mode": "delta", "seq": self.seq, "deltas": []}
+            # seq > self.seq: Client stammt aus einem früheren Serverlauf
+            if seq < self.seq and self._deltas and self._deltas[0][0] <= seq + 1:
+                deltas = [{"seq": s, "delta": d} for s, d in self._deltas if s > seq]
+                return {"mode": "delta", "seq": self.seq, "deltas": deltas}
+        return self.snapshot()
@@ -0,0 +1,178 @@
+import logging
+import threading
+
+from app.broadcast import EventBroadcaster
+from app.config import STATION_IDLE_EXIT
+from app.hardware import VirtualBoard
+from app.metrics import SOCKET_EMITS, watch_input_engine
+from app.state_stream import StateStream
+
+log = logging.getLogger(__name__)
+
+# Namespaces, an die die Events einer Station gehen (Dashboard und Remote)
+STATION_NAMESPACES = ("/", "/remote")
+
+
+def room_for(station_id):
+    return f"station:{station_id}"
+
+
+class Station:
+    """
+    Ein Automat im Serverprozess: eigene Spiel-Engine (mit eigenem
+    Eingabe-Kanal), eigener Sender mit StateStream und eigener Socket.IO-Raum.
+    """
+
+    def __init__(self, station_id, game, broadcaster, hardware=False):
+        self.id = station_id
+        self.room = room_for(station_id)
+        self.game = game
+        self.broadcaster = broadcaster
+        self.state_stream = broadcaster.stream
+        self.hardware = hardware
+
+
+class StationRegistry:
+    """
+    Verwaltet alle Stationen eines Prozesses und die Zuordnung Client -> Station.
+
+    Events einer Station gehen nur an ihren Raum (emit mit to=room), nicht an
+    alle Clients. Wer beim Verbinden keine Station nennt, landet bei der
+    ersten (der Hardware-Station) - so funktionieren alte Frontends weiter.
+    """
+
+    def __init__(self, socketio, context=None, highscore_writer=None, session_log=None):
+        self.socketio = socketio
+        self._context = context
+        self._highscore_writer = highscore_writer
+        # Gemeinsames Binärlog aller Stationen (ein Kanal pro Station), optional
+        self._session_log = session_log
+        self._stations = {}
+        # (namespace, sid) -> Station-ID
+        self._members = {}
+        self._lock = threading.Lock()
+        # Events für alle Stationen (z.B. neue Highscores) über einen eigenen Sender
+        self.everyone = EventBroadcaster(self._send_to_all, context=context)
+
+    def __iter__(self):
+        return iter(list(self._stations.values()))
+
+    def __len__(self):
+        return len(self._stations)
+
+    def get(self, station_id):
+        return self._stations.get(station_id)
+
+    @property
+    def default(self):
+        return next(iter(self._stations.values()), None)
+
+    def create(self, station_id, board=None, debug_stream=None):
+        """
+        Legt eine Station an. Ohne board nutzt sie die GPIO-Hardware; das darf
+        nur eine Station im Prozess. Mit einem VirtualBoard (siehe
+        add_virtual) kostet eine Station im Leerlauf keinen Thread.
+        """
+        from app.gpio_logic import SimonSaysGame
+
+        if station_id in self._stations:
+            raise ValueError(f"Station '{station_id}' existiert bereits")
+        virtual = board is not None and board.virtual
+
+        room = room_for(station_id)
+        broadcaster = EventBroadcaster(
+            lambda event, data: self._send_to_room(room, event, data),
+            context=self._context,
+            stream=StateStream(),
+            idle_exit=STATION_IDLE_EXIT if virtual else None,
+        )
+        game = SimonSaysGame(
+            socket_callback=broadcaster.publish,
+            highscore_writer=self._highscore_writer,
+            debug_stream=debug_stream,
+            board=board,
+            station=station_id,
+            recorder=self._session_log.channel(station_id) if self._session_log is not None else None,
+        )
+        watch_input_engine(game.input_engine, station_id)
+        broadcaster.stream.record({"leds": game.get_led_snapshot(), "difficulty": game.current_difficulty})
+
+        station = Station(station_id, game, broadcaster, hardware=not game.board.virtual)
+        self._stations[station_id] = station
+        return station
+
+    def add_virtual(self, station_id):
+        """Reine Web-Station ohne GPIO und ohne Tk."""
+        return self.create(station_id, board=VirtualBoard())
+
+    def start(self, station=None):
+        """
+        Startet die Spielschleifen (bei eventlet/gevent als Greenlets). Virtuelle
+        Stationen bekommen keinen Dauer-Thread, sondern starten pro Partie einen.
+        """
+        stations = [station] if station is not None else list(self)
+        for station in stations:
+            if station.hardware:
+                self.socketio.start_background_task(station.game.start_game_loop)
+            else:
+                station.game.start_on_demand(self.socketio.start_background_task)
+
+    # --- Clients ---
+
+    def join(self, sid, namespace, station_id=None):
+        """
+        Ordnet einen Client einer Station zu und verschiebt ihn in deren Raum.
+        Gibt die Station zurück oder None, wenn es sie nicht gibt.
+        """
+        station = self.default if station_id is None else self._stations.get(station_id)
+        if station is None:
+            return None
+        with self._lock:
+            previous = self._members.get((namespace, sid))
+            self._members[(namespace, sid)] = station.id
+        if previous is not None and previous != station.id:
+            self.socketio.server.leave_room(sid, room_for(previous), namespace=namespace)
+        self.socketio.server.enter_room(sid, station.room, namespace=namespace)
+        return station
+
+    def leave(self, sid, namespace):
+        """Beim Disconnect; die Räume räumt Socket.IO selbst auf."""
+        with self._lock:
+            self._members.pop((namespace, sid), None)
+
+    def station_for(self, sid, namespace):
+        """Station eines Clients (Fallback: die erste Station)."""
+        station_id = self._members.get((namespace, sid))
+        return self._stations.get(station_id) if station_id is not None else self.default
+
+    def clients(self):
+        counts = {station_id: 0 for station_id in self._stations}
+        with self._lock:
+            for station_id in self._members.values():
+                counts[station_id] = counts.get(station_id, 0) + 1
+        return counts
+
+    def summary(self):
+        clients = self.clients()
+        return [
+            {
+                "id": station.id,
+                "hardware": station.hardware,
+                "running": station.game.game_running,
+                "difficulty": station.game.current_difficulty,
+                "clients": clients.get(station.id, 0),
+            }
+            for station in self
+        ]
+
+    # --- Versand (läuft in den Sender-Threads der Broadcaster) ---
+
+    def _send_to_room(self, room, event, data):
+        for namespace in STATION_NAMESPACES:
+            self.socketio.emit(event, data, to=room, namespace=namespace)
+            SOCKET_EMITS.inc((event, namespace))
+
+    def _send_to_all(self, event, data):
+        for namespace in STATION_NAMESPACES:
+            self.socketio.emit(event, data, namespace=namespace)
+            SOCKET_EMITS.inc((event, namespace))
@@ -0,0 +1,161 @@
+from array import array
+
+from app.config import (
+    DIFFICULTY_SETTINGS,
+    GAME_START_DELAY,
+    ROUND_PAUSE,
+    SEQUENCE_START_DELAY,
+    VERIFY_MIN_PRESS_INTERVAL,
+)
+from app.sequence import COLORS, PackedSequence
+
+# Prüfung eines Highscores vor dem Eintragen: Aus dem Seed wird die Farbfolge
+# neu erzeugt und mit dem Eingabeprotokoll der Partie verglichen (gepackt,
+# byteweise), dazu Plausibilitätsgrenzen für die Zeiten. Kein Zugriff auf den
+# Spielzustand - nur Seed, Protokoll und der behauptete Score.
+
+
+def _ms(seconds):
+    return max(0, int(round(seconds * 1000)))
+
+
+# Mindestzeit bis zur Eingabephase (ms): Vorlauf plus Anzeige jedes Schritts
+# in der schnellsten Schwierigkeitsstufe
+_MIN_STEP_MS = _ms(min(cfg["flash"] + cfg["pause"] for cfg in DIFFICULTY_SETTINGS.values()))
+_GAME_LEAD_MS = _ms(GAME_START_DELAY + SEQUENCE_START_DELAY)
+_ROUND_LEAD_MS = _ms(ROUND_PAUSE + SEQUENCE_START_DELAY)
+# Rundung auf ganze Millisekunden
+_TOLERANCE_MS = 2
+# Bits der ersten 1..3 Einträge eines Bytes
+_MASKS = (0, 0x03, 0x0F, 0x3F)
+
+
+class Transcript:
+    """
+    Eingabeprotokoll einer Partie.
+
+    answers:   je Runde die angenommenen Farben, 2 Bit pro Eingabe wie in
+               PackedSequence; jede Runde beginnt auf einem neuen Byte
+    turns:     ms seit Spielstart, ab denen die Eingabe der Runde offen war
+    reactions: je Runde ms vom Beginn der Eingabe bis zur ersten Eingabe
+    gaps:      ms zwischen zwei Eingaben derselben Runde
+    edge_gaps: die Abstände aus gaps, bei denen beide Eingaben eine entprellte
+               Flankenzeit tragen (Hardware, SNES); nur für sie gilt der
+               Mindestabstand. Web-Eingaben tragen die Empfangszeit am Server,
+               zwei schnelle Taps kommen oft im selben Paket an.
+    Wie viele Eingaben zu welcher Runde gehören, ergibt sich aus dem Spiel:
+    Runde r hat r Eingaben, nur die letzte Runde endet früher.
+    """
+
+    __slots__ = (
+        "seed", "colors", "answers", "turns", "reactions", "gaps", "edge_gaps", "_count", "_last", "_edge", "_lookup"
+    )
+
+    def __init__(self, seed, colors=COLORS):
+        self.seed = seed
+        self.colors = tuple(colors)
+        self.answers = bytearray()
+        self.turns = array("I")
+        self.reactions = array("I")
+        self.gaps = array("I")
+        self.edge_gaps = array("I")
+        self._count = 0
+        self._last = 0
+        self._edge = False
+        self._lookup = {color: index for index, color in enumerate(self.colors)}
+
+    def begin_turn(self, elapsed):
+        self._last = _ms(elapsed)
+        self.turns.append(self._last)
+        self._count = 0
+
+    def press(self, color, elapsed, edge=True):
+        """edge: `elapsed` ist eine Flankenzeit (False bei Web-Eingaben)."""
+        index = self._lookup[color]
+        shift = (self._count & 3) << 1
+        if not shift:
+            self.answers.append(index)
+        else:
+            self.answers[-1] |= index << shift
+        # Eine Flanke kurz vor Rundenbeginn, die erst danach ankommt (Entprellung), zählt ab Rundenbeginn
+        at = max(_ms(elapsed), self._last)
+        if self._count:
+            self.gaps.append(at - self._last)
+            if edge and self._edge:
+                self.edge_gaps.append(at - self._last)
+        else:
+            self.reactions.append(at - self._last)
+        self._last = at
+        self._edge = edge
+        self._count += 1
+
+    def __len__(self):
+        return len(self.reactions) + len(self.gaps)
+
+
+def _chunk_bytes(rounds):
+    """Bytes der Runden 1..rounds in Transcript.answers (Runde r: ceil(r / 4))."""
+    quads, rest = divmod(rounds, 4)
+    return 2 * quads * (quads + 1) + rest * (quads + 1)
+
+
+def verify(transcript, score, duration_ms=None, min_press_interval=VERIFY_MIN_PRESS_INTERVAL):
+    """
+    Prüft, ob das Protokoll zu einer Partie mit `score` passt, die mit einem
+    Fehler in der letzten Runde endete. Gibt None zurück, wenn alles stimmt,
+    sonst einen kurzen Grund ("score", "sequence", "timing").
+    """
+    turns = transcript.turns
+    reactions = transcript.reactions
+    gaps = transcript.gaps
+    rounds = len(turns)
+    if rounds < 1 or score != rounds - 1 or len(reactions) != rounds:
+        return "score"
+    last = len(transcript) - rounds * (rounds - 1) // 2
+    if not 1 <= last <= rounds:
+        return "score"
+
+    # --- Farben: jede Runde muss Byte für Byte der Anfang der Folge sein ---
+    # (letztes Byte einer Runde maskiert, in der letzten Runde ohne die falsche Eingabe)
+    sequence = PackedSequence.regenerate(transcript.seed, rounds, transcript.colors)
+    packed = sequence.to_bytes()
+    answers = transcript.answers
+    wrong = last - 1
+    if len(answers) != _chunk_bytes(rounds - 1) + ((last + 3) >> 2):
+        return "sequence"
+    offset = 0
+    for length in range(1, rounds):
+        full = length >> 2
+        if answers[offset : offset + full] != packed[:full]:
+            return "sequence"
+        rest = length & 3
+        if rest and (answers[offset + full] ^ packed[full]) & _MASKS[rest]:
+            return "sequence"
+        offset += (length + 3) >> 2
+    full = wrong >> 2
+    if answers[offset : offset + full] != packed[:full]:
+        return "sequence"
+    if wrong & 3 and (answers[offset + full] ^ packed[full]) & _MASKS[wrong & 3]:
+        return "sequence"
+    if (answers[offset + (wrong >> 2)] >> ((wrong & 3) << 1)) & 3 == sequence.index_at(wrong):
+        return "sequence"
+
+    # --- Zeiten ---
+    edge_gaps = transcript.edge_gaps
+    if edge_gaps and min(edge_gaps) < _ms(min_press_interval) - _TOLERANCE_MS:
+        return "timing"
+    end = 0
+    first = 0
+    lead = _GAME_LEAD_MS
+    for length in range(1, rounds + 1):
+        # Vor jeder Eingabephase lief die Anzeige der ganzen Folge
+        turn = turns[length - 1]
+        if turn + _TOLERANCE_MS < end + lead + length * _MIN_STEP_MS:
+            return "timing"
+        lead = _ROUND_LEAD_MS
+        count = length - 1 if length < rounds else wrong
+        end = turn + reactions[length - 1] + (sum(gaps[first : first + count]) if count else 0)
+        first += count
+    if duration_ms is not None and end > duration_ms + _TOLERANCE_MS:
+        return "timing"
+    return None
@@ -100,13 +100,13 @@ class GPIOEmulator:
             if self.root:
                 self.root.after(0, update)
 
-    def add_button(self, pin, name=None, callback=None):
+    def add_button(self, pin, name=None, callback=None, release_callback=None):
         if self.root:
-            self.root.after(0, lambda: self._create_button_widget(pin, name, callback))
+            self.root.after(0, lambda: self._create_button_widget(pin, name, callback, release_callback))
         else:
-            self.pending_actions.append(lambda: self._create_button_widget(pin, name, callback))
+            self.pending_actions.append(lambda: self._create_button_widget(pin, name, callback, release_callback))
 
-    def _create_button_widget(self, pin, name, callback=None):
+    def _create_button_widget(self, pin, name, callback=None, release_callback=None):
         frame = tk.Frame(self.main_frame)
         frame.pack(fill=tk.X, pady=5)
         
@@ -117,7 +117,12 @@ class GPIOEmulator:
         btn = tk.Button(frame, text="PUSH", command=lambda: self._press_button(pin))
         btn.pack(side=tk.RIGHT)
         
-        self.buttons[pin] = {"state": False, "widget": btn, "callback": callback}
+        self.buttons[pin] = {
+            "state": False,
+            "widget": btn,
+            "callback": callback,
+            "release_callback": release_callback,
+        }
 
     def _press_button(self, pin):
         if pin in self.buttons:
@@ -132,6 +137,9 @@ class GPIOEmulator:
     def _release_button(self, pin):
         if pin in self.buttons:
             self.buttons[pin]["state"] = False
+            release_callback = self.buttons[pin].get("release_callback")
+            if release_callback:
+                release_callback()
 
     def get_button_state(self, pin):
         if pin in self.buttons:
@@ -198,13 +206,18 @@ class Button:
     def __init__(self, pin, **kwargs):
         self.pin = pin
         self.when_pressed = None
+        self.when_released = None
         name = _get_pin_label(pin, "Button")
-        _get_emulator().add_button(pin, name=name, callback=self._handle_press)
+        _get_emulator().add_button(pin, name=name, callback=self._handle_press, release_callback=self._handle_release)
 
     def _handle_press(self):
         if self.when_pressed:
             self.when_pressed()
 
+    def _handle_release(self):
+        if self.when_released:
+            self.when_released()
+
     @property
     def is_pressed(self):
         return _get_emulator().get_button_state(self.pin)
@@ -0,0 +1,46 @@
+import argparse
+import sys
+
+from app.recorder import read_sessions, replay
+
+# Aufgezeichnete Spiele auflisten und auf virtueller Uhr nachspielen.
+#   python replay.py logs/sessions.simrec              -> Liste
+#   python replay.py logs/sessions.simrec -s 3         -> Session 3 nachspielen
+#   python replay.py logs/sessions.simrec --all        -> alle prüfen
+#   python replay.py logs/sessions.simrec -s 3 --speed 10
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simon Says Session-Replay")
+    parser.add_argument("log", help="Session-Log (SESSION_LOG)")
+    parser.add_argument("-s", "--session", type=int, action="append", help="Nummer aus der Liste (mehrfach möglich)")
+    parser.add_argument("--all", action="store_true", help="alle abgeschlossenen Sessions nachspielen")
+    parser.add_argument("--speed", type=float, default=None, help="Faktor gegenüber Echtzeit (ohne: so schnell wie möglich)")
+    args = parser.parse_args()
+
+    sessions = read_sessions(args.log)
+    if not args.session and not args.all:
+        for number, session in enumerate(sessions):
+            print(f"{number:>4}  {session!r}{'' if session.complete else '  (unvollständig)'}")
+        return 0
+
+    numbers = range(len(sessions)) if args.all else args.session
+    failed = 0
+    for number in numbers:
+        session = sessions[number]
+        if not session.complete:
+            print(f"{number:>4}  übersprungen (unvollständig)")
+            continue
+        result = replay(session, speed=args.speed)
+        ok = result.sequence_ok and result.score == result.recorded_score
+        failed += not ok
+        print(
+            f"{number:>4}  {'OK    ' if ok else 'ABWEICHUNG'}  score {result.score}/{result.recorded_score}"
+            f"  LEDs {'gleich' if result.leds_ok else 'abweichend'} ({result.leds})"
+            f"  {result.virtual_seconds:.1f}s Spielzeit in {result.wall_seconds * 1000:.0f} ms"
+        )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
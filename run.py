@@ -1,6 +1,17 @@
 import os
 import sys
 import threading
+
+# Monkey-Patching muss passieren, BEVOR Flask/Socket.IO/threading importiert werden.
+# Dadurch kooperieren auch time.sleep, Conditions und Threads der Spiellogik mit dem Event-Loop.
+ASYNC_MODE = os.environ.get('SIMON_ASYNC_MODE', 'threading').lower()
+if ASYNC_MODE == 'eventlet':
+    import eventlet
+    eventlet.monkey_patch()
+elif ASYNC_MODE == 'gevent':
+    from gevent import monkey
+    monkey.patch_all()
+
 from app import create_app, socketio
 from app.config import IS_RASPI
 
@@ -12,10 +23,14 @@ if __name__ == "__main__":
     
     # Check if we should run GUI (only on Local PC, not on Pi/Docker)
     is_headless = os.environ.get('HEADLESS', '0') == '1' or IS_RASPI
+
+    if not is_headless and ASYNC_MODE != 'threading':
+        # Tk braucht den Main-Thread, der Event-Loop von eventlet/gevent ebenfalls
+        sys.exit(f"SIMON_ASYNC_MODE={ASYNC_MODE} geht nur headless (HEADLESS=1).")
     
     if is_headless:
         # Auf dem Pi/Docker läuft der Server direkt im Main-Thread
-        print("Starte Server im Main-Thread (Standard-Threading Modus)...")
+        print(f"Starte Server im Main-Thread ({ASYNC_MODE}-Modus)...")
         socketio.run(app, host='0.0.0.0', port=5000, debug=False, allow_unsafe_werkzeug=True, use_reloader=False)
     else:
         # Nur auf dem PC: Server im Hintergrund für GUI
@@ -31,4 +46,4 @@ if __name__ == "__main__":
             _get_emulator().run()
         except Exception as e:
             print(f"GUI konnte nicht gestartet werden: {e}")
-            t.join()
\ No newline at end of file
+            t.join()
@@ -0,0 +1,47 @@
+import sys
+import os
+import statistics
+
+# Add the project root directory to the python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.simulation import Simulation, ScriptedPlayer, PLAYER_SOURCES
+
+# Benchmark der Spiel-Engine ohne Hardware (virtuelle Uhr, siehe app/simulation.py)
+# Aufruf: python tests/bench_simulation.py [spiele_pro_quelle] [runden_pro_spiel]
+GAMES = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+ROUNDS = int(sys.argv[2]) if len(sys.argv) > 2 else 15
+
+print(f"Simon Says Engine-Benchmark: {GAMES} Spiele x {ROUNDS} Runden pro Quelle")
+print("-" * 78)
+print(f"{'Quelle':<10}{'µs/Runde':>12}{'CPU ms/Spiel':>14}{'Emits/Runde':>14}{'Faktor':>12}{'Spiel-s':>10}")
+
+for difficulty in ("easy", "medium", "hard"):
+    print(f"Schwierigkeit: {difficulty}")
+    for source in PLAYER_SOURCES:
+        sim = Simulation(seed=42, difficulty=difficulty)
+        results = [
+            sim.play(ScriptedPlayer(source, rounds=ROUNDS, seed=game)) for game in range(GAMES)
+        ]
+
+        rounds = sum(r.rounds for r in results)
+        wall = sum(r.wall_seconds for r in results)
+        cpu = [r.cpu_seconds * 1000 for r in results]
+        virtual = sum(r.virtual_seconds for r in results)
+        emits = sum(sum(r.emits.values()) for r in results)
+
+        print(
+            f"  {source:<8}"
+            f"{wall / rounds * 1e6:>12.1f}"
+            f"{statistics.mean(cpu):>14.2f}"
+            f"{emits / rounds:>14.1f}"
+            f"{virtual / wall:>11.0f}x"
+            f"{virtual / len(results):>10.1f}"
+        )
+
+        # Alle Spiele müssen wie geskriptet enden, sonst stimmt etwas mit der Engine nicht
+        assert all(r.rounds == ROUNDS for r in results), "Spiel endete nicht in der geskripteten Runde"
+        assert len(sim.highscores) == GAMES, "Nicht alle Highscores angekommen"
+
+print("-" * 78)
+print("Fertig.")
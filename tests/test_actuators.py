@@ -0,0 +1,54 @@
+import sys
+import os
+
+# Add the project root directory to the python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.actuators import ActuatorScheduler
+from app.clock import VirtualClock
+
+
+def make_scheduler():
+    clock = VirtualClock()
+    switched = []
+    scheduler = ActuatorScheduler(lambda target, state: switched.append((clock.now(), target, state)), clock=clock)
+    return clock, scheduler, switched
+
+
+def test_immediate_flash_before_planned_flash():
+    # Wie während play_sequence: ein Flash liegt schon in der Zukunft, dann kommt ein Tastendruck
+    clock, scheduler, switched = make_scheduler()
+    scheduler.flash("red", 0.5, at=5.0)
+    scheduler.flash("red", 0.5)
+    clock.advance_to(10.0)
+    assert switched == [(0.0, "red", True), (0.5, "red", False), (5.0, "red", True), (5.5, "red", False)]
+
+
+def test_overlapping_flashes_are_merged():
+    clock, scheduler, switched = make_scheduler()
+    scheduler.flash("red", 0.5, at=1.0)
+    scheduler.flash("red", 0.5, at=1.3)
+    clock.advance_to(5.0)
+    assert switched == [(1.0, "red", True), (1.8, "red", False)]
+
+
+def test_flash_bridging_two_intervals():
+    clock, scheduler, switched = make_scheduler()
+    scheduler.flash("red", 0.5, at=1.0)
+    scheduler.flash("red", 0.5, at=2.0)
+    scheduler.flash("red", 1.0, at=1.2)
+    scheduler.flash("red", 0.5, at=0.8)
+    clock.advance_to(5.0)
+    states = [(at, state) for at, _, state in switched]
+    assert states[0] == (0.8, True)
+    assert states[-1] == (2.5, False)
+    assert [state for _, state in states].count(False) == 1
+
+
+def test_cancel_drops_planned_flashes():
+    clock, scheduler, switched = make_scheduler()
+    scheduler.flash("red", 0.5, at=1.0)
+    scheduler.flash("buzzer", 0.5, at=1.0)
+    scheduler.cancel("red")
+    clock.advance_to(5.0)
+    assert switched == [(1.0, "buzzer", True), (1.5, "buzzer", False)]
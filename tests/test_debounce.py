@@ -0,0 +1,66 @@
+import sys
+import os
+
+# Add the project root directory to the python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.clock import VirtualClock
+from app.debounce import Debouncer
+
+KEY = ("hardware", "red")
+
+
+def make_debouncer(bounce=0.05, hold=0.02):
+    clock = VirtualClock()
+    events = []
+    debouncer = Debouncer(
+        lambda key, pressed, timestamp: events.append((key, pressed, timestamp)),
+        bounce=bounce,
+        hold=hold,
+        overrides={},
+        clock=clock,
+    )
+    debouncer.add(KEY)
+    return clock, debouncer, events
+
+
+def feed_at(clock, debouncer, at, level):
+    clock.call_at(at, lambda: debouncer.feed(KEY, level))
+
+
+def test_press_counts_after_hold_with_edge_timestamp():
+    clock, debouncer, events = make_debouncer()
+    feed_at(clock, debouncer, 1.0, True)
+    clock.advance_to(1.01)
+    assert events == []
+    clock.advance_to(2.0)
+    assert events == [(KEY, True, 1.0)]
+    assert debouncer.is_pressed(KEY)
+
+
+def test_glitch_shorter_than_hold_is_dropped():
+    clock, debouncer, events = make_debouncer()
+    feed_at(clock, debouncer, 1.0, True)
+    feed_at(clock, debouncer, 1.005, False)
+    clock.advance_to(2.0)
+    assert events == []
+    assert debouncer.filtered == 1
+
+
+def test_bounce_after_press_is_ignored():
+    clock, debouncer, events = make_debouncer()
+    feed_at(clock, debouncer, 1.0, True)
+    # Prellen beim Loslassen innerhalb des Bounce-Fensters, Taste bleibt am Ende offen
+    for step, level in enumerate((False, True, False, True, False)):
+        feed_at(clock, debouncer, 1.03 + step * 0.002, level)
+    clock.advance_to(2.0)
+    assert [(pressed, round(at, 3)) for _, pressed, at in events] == [(True, 1.0), (False, 1.038)]
+    assert not debouncer.is_pressed(KEY)
+
+
+def test_release_without_hold():
+    clock, debouncer, events = make_debouncer(hold=0.0)
+    feed_at(clock, debouncer, 1.0, True)
+    feed_at(clock, debouncer, 1.2, False)
+    clock.advance_to(2.0)
+    assert events == [(KEY, True, 1.0), (KEY, False, 1.2)]
@@ -0,0 +1,83 @@
+import sys
+import os
+import time
+
+# Add the project root directory to the python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import recorder
+from app.recorder import SessionLog, read_sessions, replay
+from app.simulation import Simulation, ScriptedPlayer, PLAYER_SOURCES
+
+
+def record_games(path, games, **options):
+    log = SessionLog(str(path), **options)
+    results = []
+    for number, source in enumerate(games):
+        sim = Simulation(seed=number, difficulty=("easy", "medium", "hard")[number % 3])
+        sim.game.recorder = log.channel(f"station{number % 2}")
+        results.append(sim.play(ScriptedPlayer(source, rounds=4 + number, seed=number, name=f"P{number}")))
+    log.close()
+    return results
+
+
+def test_round_trip_and_replay(tmp_path):
+    path = tmp_path / "sessions.simrec"
+    results = record_games(path, PLAYER_SOURCES)
+    sessions = read_sessions(str(path))
+    assert [s.score for s in sessions] == [r.score for r in results]
+    for number, session in enumerate(sessions):
+        assert session.complete
+        assert session.station == f"station{number % 2}"
+        assert session.name == f"P{number}"
+        assert len(session.steps) == results[number].rounds
+        replayed = replay(session)
+        assert replayed.score == session.score
+        assert replayed.sequence_ok
+        assert replayed.leds_ok
+
+
+def test_truncated_log_is_readable(tmp_path):
+    path = tmp_path / "sessions.simrec"
+    record_games(path, PLAYER_SOURCES)
+    data = path.read_bytes()
+    cut = tmp_path / "cut.simrec"
+    cut.write_bytes(data[: len(data) * 2 // 3])
+    sessions = read_sessions(str(cut))
+    assert sessions and sessions[0].complete
+    assert not sessions[-1].complete
+
+
+def test_rotation_keeps_sessions_whole(tmp_path):
+    path = tmp_path / "sessions.simrec"
+    record_games(path, ["web"] * 6, max_bytes=1000, backup_count=5)
+    files = sorted(tmp_path.iterdir())
+    assert len(files) > 1
+    sessions = [s for f in files for s in read_sessions(str(f))]
+    assert len(sessions) == 6
+    assert all(s.complete and replay(s).sequence_ok for s in sessions)
+
+
+def test_changed_symbol_table_starts_new_file(tmp_path, monkeypatch):
+    path = tmp_path / "sessions.simrec"
+    record_games(path, ["web"])
+    monkeypatch.setattr(recorder, "SYMBOLS", ("neu",) + recorder.SYMBOLS)
+    record_games(path, ["web"])
+    assert len(read_sessions(str(path))) == 1
+    assert len(read_sessions(str(path) + ".1")) == 1
+
+
+def test_unwritable_log_drops_records(tmp_path):
+    blocker = tmp_path / "file"
+    blocker.write_text("")
+    log = SessionLog(str(blocker / "sessions.simrec"))
+    channel = log.channel("main")
+    for step in range(10):
+        channel.record(recorder.INPUT, float(step), "web", "red", True)
+    deadline = time.monotonic() + 5.0
+    while not log.failed and time.monotonic() < deadline:
+        time.sleep(0.01)
+    channel.record(recorder.INPUT, 11.0, "web", "red", True)
+    assert log.failed
+    assert log._thread is None
+    assert log._queue.qsize() == 0
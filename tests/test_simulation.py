@@ -0,0 +1,117 @@
+import sys
+import os
+import copy
+
+import pytest
+
+# Add the project root directory to the python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.simulation import Simulation, ScriptedPlayer, PLAYER_SOURCES
+from app.latency import latency
+from app.metrics import GAMES_STARTED, INPUT_EVENTS
+from app.verify import verify
+
+
+def play(source="web", rounds=5, seed=1, difficulty="medium"):
+    sim = Simulation(seed=seed, difficulty=difficulty)
+    result = sim.play(ScriptedPlayer(source, rounds=rounds, seed=seed))
+    return sim, result
+
+
+@pytest.mark.parametrize("source", PLAYER_SOURCES)
+def test_scripted_game_ends_in_planned_round(source):
+    sim, result = play(source, rounds=6)
+    assert result.rounds == 6
+    assert result.score == 5
+    assert [entry["score"] for entry in sim.highscores] == [5]
+    assert sim.highscores[0]["sequence_length"] == 6
+
+
+def test_same_seed_same_game():
+    first, _ = play(seed=7)
+    second, _ = play(seed=7)
+    assert first.game.sequence == second.game.sequence
+    assert first.game.transcript.gaps == second.game.transcript.gaps
+
+
+@pytest.mark.parametrize("difficulty", ["easy", "medium", "hard"])
+def test_transcript_of_real_game_verifies(difficulty):
+    sim, _ = play("hardware", rounds=8, difficulty=difficulty)
+    game = sim.game
+    assert verify(game.transcript, game.current_score, game.game_duration_ms) is None
+
+
+def test_verify_rejects_tampering():
+    sim, _ = play("snes", rounds=7)
+    game = sim.game
+    transcript = game.transcript
+
+    assert verify(transcript, game.current_score + 1, game.game_duration_ms) == "score"
+
+    wrong_answer = copy.copy(transcript)
+    wrong_answer.answers = bytearray(transcript.answers)
+    wrong_answer.answers[2] ^= 0x01
+    assert verify(wrong_answer, game.current_score, game.game_duration_ms) == "sequence"
+
+    other_seed = copy.copy(transcript)
+    other_seed.seed ^= 1
+    assert verify(other_seed, game.current_score, game.game_duration_ms) == "sequence"
+
+    too_fast = copy.copy(transcript)
+    too_fast.edge_gaps = type(transcript.edge_gaps)("I", [10] * len(transcript.edge_gaps))
+    assert verify(too_fast, game.current_score, game.game_duration_ms) == "timing"
+
+    early_turn = copy.copy(transcript)
+    early_turn.turns = type(transcript.turns)("I", transcript.turns)
+    early_turn.turns[3] = early_turn.turns[2]
+    assert verify(early_turn, game.current_score, game.game_duration_ms) == "timing"
+
+
+class BurstPlayer(ScriptedPlayer):
+    """Web-Spieler, bei dem je zwei Taps im selben Paket am Server ankommen."""
+
+    def schedule_round(self, sim):
+        at = sim.clock.now()
+        for index, color in enumerate(self.answers(sim.game.sequence, sim.game.colors)):
+            at += 0.005 if index % 2 else self._delay(self.reaction)
+            sim.clock.call_at(at, lambda c=color: self.press(sim, c))
+
+
+def test_web_presses_in_one_burst_are_not_rejected():
+    sim = Simulation(seed=4)
+    result = sim.play(BurstPlayer("web", rounds=6, seed=4))
+    assert min(sim.game.transcript.gaps) < 10
+    assert [entry["score"] for entry in sim.highscores] == [result.score] == [5]
+
+
+def test_name_outside_name_prompt_is_ignored():
+    sim, _ = play(rounds=3)
+    sim.game.on_name_submitted("LATE")
+    assert [entry["name"] for entry in sim.highscores] == ["SIM"]
+
+
+def test_remote_press_during_sequence_flashes():
+    # Der Flash des Tastendrucks liegt vor den von play_sequence geplanten Flashes derselben Farbe
+    sim = Simulation(seed=3)
+    game = sim.game
+    game.sequence.extend_random(4)
+    switched = []
+    game.socket_callback = lambda event, data: switched.append((sim.clock.now(), data)) if event == "led_state" else None
+    color = game.sequence[-1]
+    pressed_at = sim.clock.now() + 0.1
+    sim.clock.call_at(pressed_at, lambda: game.process_remote_input(color, sid="test"))
+    game.play_sequence()
+    on_times = [at for at, data in switched if data["color"] == color and data["state"] == "on"]
+    assert on_times and on_times[0] == pytest.approx(pressed_at)
+
+
+def test_simulated_games_stay_out_of_process_stats():
+    # Virtuelle Zeiten dürfen nicht in /admin/latency und /metrics landen
+    before = {path: h.count for path, h in latency.histograms.items()}
+    started, inputs = GAMES_STARTED.value(), INPUT_EVENTS.value(("hardware",))
+    sim, _ = play("hardware", rounds=4)
+    assert {path: h.count for path, h in latency.histograms.items()} == before
+    assert (GAMES_STARTED.value(), INPUT_EVENTS.value(("hardware",))) == (started, inputs)
+    assert sim.game.latency is not latency
+    assert sim.game.latency.histograms["input_wait"].count == 10